@@ -0,0 +1,199 @@
+"""Responses served by the benchmark server
+
+Recorded responses can be dropped in benchmarks/fixtures/<method>.json (e.g.
+user.getrecenttracks.json) and are used instead of the generated ones."""
+
+import json
+import os
+from typing import Any, Dict, List
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+IMAGE_PREFIX = "https://lastfm.freetls.fastly.net/i/u/"
+IMAGE_SIZES = (
+    ("small", "34s"),
+    ("medium", "64s"),
+    ("large", "174s"),
+    ("extralarge", "300x300"),
+    ("mega", "300x300"),
+    ("", "300x300"),
+)
+
+
+def images(seed: int) -> List[Dict[str, str]]:
+    return [
+        {"size": size, "#text": f"{IMAGE_PREFIX}{path}/{seed:032x}.png"}
+        for size, path in IMAGE_SIZES
+    ]
+
+
+def user_getinfo() -> Dict[str, Any]:
+    return {
+        "user": {
+            "name": "crygup",
+            "age": "0",
+            "subscriber": "0",
+            "realname": "",
+            "bootstrap": "0",
+            "playcount": "123456",
+            "artist_count": "2345",
+            "playlists": "0",
+            "track_count": "23456",
+            "album_count": "6789",
+            "image": images(1),
+            "registered": {"unixtime": "1500000000", "#text": 1500000000},
+            "country": "None",
+            "gender": "n",
+            "url": "https://www.last.fm/user/crygup",
+            "type": "user",
+        }
+    }
+
+
+def artist_getinfo() -> Dict[str, Any]:
+    return {
+        "artist": {
+            "name": "Radiohead",
+            "mbid": "a74b1b7f-71a5-4011-9441-d0b5e4122711",
+            "url": "https://www.last.fm/music/Radiohead",
+            "image": images(2),
+            "streamable": "0",
+            "ontour": "0",
+            "stats": {
+                "listeners": "6000000",
+                "playcount": "800000000",
+                "userplaycount": "1234",
+            },
+            "similar": {
+                "artist": [
+                    {
+                        "name": f"Similar {index}",
+                        "url": f"https://www.last.fm/music/Similar+{index}",
+                        "image": images(100 + index),
+                    }
+                    for index in range(5)
+                ]
+            },
+            "tags": {
+                "tag": [
+                    {"name": name, "url": f"https://www.last.fm/tag/{name}"}
+                    for name in ("alternative", "rock", "experimental")
+                ]
+            },
+            "bio": {
+                "published": "01 Feb 2006, 20:52",
+                "summary": "Radiohead are an English rock band. " * 5,
+                "content": "Radiohead are an English rock band. " * 100,
+            },
+        }
+    }
+
+
+def album_getinfo() -> Dict[str, Any]:
+    return {
+        "album": {
+            "artist": "Radiohead",
+            "mbid": "b1392450-e666-3926-a536-22c65f834433",
+            "tags": {
+                "tag": [
+                    {"url": f"https://www.last.fm/tag/{name}", "name": name}
+                    for name in ("alternative", "rock", "1997")
+                ]
+            },
+            "playcount": "60000000",
+            "image": images(3),
+            "tracks": {"track": []},
+            "url": "https://www.last.fm/music/Radiohead/OK+Computer",
+            "name": "OK Computer",
+            "listeners": "2000000",
+            "userplaycount": 321,
+            "wiki": {
+                "published": "10 Jan 2009, 02:41",
+                "summary": "OK Computer is the third studio album. " * 5,
+                "content": "OK Computer is the third studio album. " * 80,
+            },
+        }
+    }
+
+
+def user_getrecenttracks(
+    limit: int = 200,
+    page: int = 1,
+    total: int = 200_000,
+    extended: bool = False,
+    now_playing: bool = True,
+) -> Dict[str, Any]:
+    tracks: List[Dict[str, Any]] = []
+    start = (page - 1) * limit
+
+    for index in range(start, min(start + limit, total)):
+        artist = index % 700
+        album = index % 2500
+        artist_name = f"Artist {artist}"
+
+        if extended:
+            artist_data: Dict[str, Any] = {
+                "url": f"https://www.last.fm/music/Artist+{artist}",
+                "name": artist_name,
+                "image": images(artist),
+                "mbid": "",
+            }
+        else:
+            artist_data = {"mbid": "", "#text": artist_name}
+
+        uts = 1_700_000_000 - index * 210
+
+        tracks.append(
+            {
+                "artist": artist_data,
+                "streamable": "0",
+                "image": images(10_000 + album),
+                "mbid": "",
+                "album": {"mbid": "", "#text": f"Album {album}"},
+                "name": f"Track {index % 9000}",
+                "url": f"https://www.last.fm/music/Artist+{artist}/_/Track+{index % 9000}",
+                "date": {"uts": str(uts), "#text": "14 Nov 2023, 22:13"},
+                **({"loved": "0"} if extended else {}),
+            }
+        )
+
+    if now_playing and tracks:
+        playing = dict(tracks[0])
+        playing.pop("date")
+        playing["@attr"] = {"nowplaying": "true"}
+        tracks.insert(0, playing)
+
+    return {
+        "recenttracks": {
+            "track": tracks,
+            "@attr": {
+                "user": "crygup",
+                "totalPages": str(-(-total // limit)),
+                "page": str(page),
+                "perPage": str(limit),
+                "total": str(total),
+            },
+        }
+    }
+
+
+GENERATORS = {
+    "user.getinfo": user_getinfo,
+    "artist.getinfo": artist_getinfo,
+    "album.getinfo": album_getinfo,
+}
+
+
+def load(method: str, **params: Any) -> Dict[str, Any]:
+    """Response for a method, recorded if available"""
+
+    method = method.lower()
+    path = os.path.join(FIXTURES_DIR, f"{method}.json")
+
+    if os.path.exists(path):
+        with open(path) as f:
+            return json.load(f)
+
+    if method == "user.getrecenttracks":
+        return user_getrecenttracks(**params)
+
+    return GENERATORS[method]()
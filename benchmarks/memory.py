@@ -0,0 +1,142 @@
+"""Compares the per-object memory of the models with how they used to be stored
+
+Current tracks are parsed from generated multi-page responses by the client's
+own parser, so sharing between tracks shows up in the numbers.
+
+Run with `python benchmarks/memory.py [count]`."""
+
+import datetime
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# the package is imported from this checkout, installed or not
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixtures
+
+import lastfm
+
+# scrobbles per generated user.getRecentTracks page
+PAGE_SIZE = 200
+
+
+def make_pages(count: int) -> List[Dict[Any, Any]]:
+    """Decoded user.getRecentTracks pages holding `count` scrobbles"""
+
+    return [
+        fixtures.user_getrecenttracks(
+            limit=PAGE_SIZE, page=page, total=count, now_playing=False
+        )
+        for page in range(1, -(-count // PAGE_SIZE) + 1)
+    ]
+
+
+# the models as they were before they had __slots__
+class LegacyImage:
+    def __init__(self, data: Dict[Any, Any]) -> None:
+        self._data = data
+
+
+@dataclass(frozen=True)
+class LegacyArtist:
+    musicbrainz_id: Optional[str]
+    name: str
+    url: Optional[str]
+    images: Optional[LegacyImage]
+
+
+@dataclass(frozen=True)
+class LegacyAlbum:
+    musicbrainz_id: Optional[str]
+    name: str
+
+
+@dataclass(frozen=True)
+class LegacyAttr:
+    user: str
+    total_pages: int
+    page: int
+    per_page: int
+    total_scrobbles: int
+
+
+@dataclass(frozen=True)
+class LegacyTrack:
+    artist: LegacyArtist
+    musicbrainz_id: Optional[str]
+    name: str
+    url: str
+    images: LegacyImage
+    album: LegacyAlbum
+    now_playing: Optional[bool]
+    loved: Optional[bool]
+    attr: LegacyAttr
+    played_at: Optional[datetime.datetime]
+
+
+def build_legacy_track(data: Dict[Any, Any]) -> LegacyTrack:
+    return LegacyTrack(
+        artist=LegacyArtist(None, data["artist"]["#text"], None, None),
+        musicbrainz_id=data["mbid"],
+        name=data["name"],
+        url=data["url"],
+        images=LegacyImage(data["image"]),
+        album=LegacyAlbum(None, data["album"]["#text"]),
+        now_playing=False,
+        loved=False,
+        attr=LegacyAttr("user", 1, 1, 200, 200),
+        played_at=datetime.datetime.utcfromtimestamp(int(data["date"]["uts"])),
+    )
+
+
+def build_legacy(pages: List[Dict[Any, Any]]) -> Any:
+    return [
+        build_legacy_track(track)
+        for page in pages
+        for track in page["recenttracks"]["track"]
+    ]
+
+
+def parse_current(pages: List[Dict[Any, Any]]) -> Any:
+    # parsed the way the client parses responses, so sharing between tracks
+    # is measured too. The client is kept alive along with the tracks as its
+    # entity cache stays around in a real process
+    client = lastfm.AsyncClient("benchmark")
+    tracks = [track for page in pages for track in client.parse_recent_tracks(page)]
+
+    return client, tracks
+
+
+def measure(build: Callable[[List[Dict[Any, Any]]], Any], count: int) -> float:
+    """Bytes per scrobble still allocated once the response data is dropped"""
+
+    tracemalloc.start()
+
+    pages = make_pages(count)
+    objects = build(pages)
+    del pages
+
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del objects
+    return size / count
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    legacy = measure(build_legacy, count)
+    current = measure(parse_current, count)
+
+    print(f"objects:  {count}")
+    print(f"legacy:   {legacy:8.1f} bytes/object")
+    print(f"current:  {current:8.1f} bytes/object")
+    print(f"saved:    {100 * (1 - current / legacy):8.1f}%")
+
+
+if __name__ == "__main__":
+    main()
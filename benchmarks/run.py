@@ -0,0 +1,198 @@
+"""Offline benchmarks for the client, run against a local stand-in server
+
+Measures request throughput and latency through AsyncClient, decode and
+parse time per recent track and memory per parsed object. Results can be
+appended to benchmarks/results.jsonl, keyed on the current commit, and
+compared with the previous run.
+
+Run with `python benchmarks/run.py --save --compare`."""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# the package is imported from this checkout, installed or not
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixtures
+import memory
+from server import FakeLastFM
+
+import lastfm
+
+RESULTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.jsonl")
+
+
+def percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def load_test(
+    call: Callable[[], Awaitable[Any]], requests: int, concurrency: int
+) -> Dict[str, float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one() -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "requests_per_second": requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def parse_benchmark(client: lastfm.AsyncClient, pages: int) -> Dict[str, float]:
+    body = json.dumps(fixtures.user_getrecenttracks(limit=200)).encode()
+    items = 0
+
+    start = time.perf_counter()
+    for _ in range(pages):
+        client.decoder(body)
+    decode = time.perf_counter() - start
+
+    data = client.decoder(body)
+    start = time.perf_counter()
+    for _ in range(pages):
+        items += len(client.parse_recent_tracks(data))
+    parse = time.perf_counter() - start
+
+    return {
+        "decode_ms_per_page": decode / pages * 1000,
+        "parse_us_per_item": parse / items * 1_000_000,
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    server = FakeLastFM(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate
+    )
+    base_url = await server.start()
+
+    client = lastfm.AsyncClient(
+        "benchmark",
+        retry_policy=lastfm.RetryPolicy(base_delay=0.01, max_delay=0.1),
+        connection_options=lastfm.ConnectionOptions(limit=args.concurrency),
+    )
+    client.base_url = base_url
+
+    results: Dict[str, Any] = {}
+
+    try:
+        results["artist_getinfo"] = await load_test(
+            lambda: client.fetch_artist("Radiohead"), args.requests, args.concurrency
+        )
+        results["user_getinfo"] = await load_test(
+            lambda: client.fetch_user("crygup"), args.requests, args.concurrency
+        )
+        results["album_getinfo"] = await load_test(
+            lambda: client.fetch_album("Radiohead", "OK Computer"),
+            args.requests,
+            args.concurrency,
+        )
+        results["user_getrecenttracks"] = await load_test(
+            lambda: client.fetch_user_recent_tracks("crygup", limit=200),
+            max(args.requests // 10, 1),
+            args.concurrency,
+        )
+    finally:
+        await client.close()
+        await server.close()
+
+    results["recent_tracks_parsing"] = parse_benchmark(client, args.pages)
+    results["memory"] = {
+        "bytes_per_recent_track": memory.measure(memory.parse_current, args.objects)
+    }
+
+    return results
+
+
+def commit() -> Optional[str]:
+    try:
+        return (
+            subprocess.check_output(
+                ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL
+            )
+            .decode()
+            .strip()
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_run() -> Optional[Dict[str, Any]]:
+    if not os.path.exists(RESULTS_PATH):
+        return None
+
+    with open(RESULTS_PATH) as f:
+        lines = [line for line in f if line.strip()]
+
+    return json.loads(lines[-1]) if lines else None
+
+
+def report(results: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> None:
+    for group, values in results.items():
+        print(group)
+
+        for name, value in values.items():
+            line = f"  {name:<24} {value:12.2f}"
+
+            old = (previous or {}).get("results", {}).get(group, {}).get(name)
+
+            if old:
+                line += f"  ({(value - old) / old * 100:+.1f}% vs {previous['commit']})"  # type: ignore
+
+            print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--objects", type=int, default=50_000)
+    parser.add_argument("--save", action="store_true", help="append to results.jsonl")
+    parser.add_argument("--compare", action="store_true", help="compare to last save")
+    args = parser.parse_args()
+
+    previous = previous_run() if args.compare else None
+    results = asyncio.run(run(args))
+
+    report(results, previous)
+
+    if args.save:
+        entry = {
+            "commit": commit(),
+            "date": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "options": vars(args),
+            "results": results,
+        }
+
+        with open(RESULTS_PATH, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+if __name__ == "__main__":
+    main()
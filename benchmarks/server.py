@@ -0,0 +1,108 @@
+"""A local stand-in for ws.audioscrobbler.com serving the fixtures"""
+
+import asyncio
+import json
+import random
+from typing import Dict, Optional, Tuple
+
+from aiohttp import web
+
+import fixtures
+
+
+class FakeLastFM:
+    """Serves fixtures on http://host:port/2.0
+
+    Every response is delayed by `latency` seconds plus up to `jitter`
+    seconds. A share of requests equal to `error_rate` fails, half of them
+    with last.fm's rate limit error (29) and half with an HTTP 503."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        total_scrobbles: int = 200_000,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.total_scrobbles = total_scrobbles
+        self.requests = 0
+
+        self._runner: Optional[web.AppRunner] = None
+        self._bodies: Dict[Tuple[str, ...], bytes] = {}
+
+    def _body(self, method: str, query: "web.MultiDictProxy[str]") -> bytes:
+        params: Tuple[str, ...] = (method,)
+
+        if method == "user.getrecenttracks":
+            params += (
+                query.get("limit", "50"),
+                query.get("page", "1"),
+                query.get("extended", "0"),
+            )
+
+        body = self._bodies.get(params)
+
+        if body is None:
+            if method == "user.getrecenttracks":
+                data = fixtures.load(
+                    method,
+                    limit=int(params[1]),
+                    page=int(params[2]),
+                    extended=params[3] == "1",
+                    total=self.total_scrobbles,
+                )
+            else:
+                data = fixtures.load(method)
+
+            body = self._bodies[params] = json.dumps(data).encode()
+
+        return body
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        delay = self.latency + random.uniform(0, self.jitter)
+
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and random.random() < self.error_rate:
+            if random.random() < 0.5:
+                return web.json_response(
+                    {"error": 29, "message": "Rate Limit Exceeded"}, status=429
+                )
+
+            return web.Response(status=503, text="Service Unavailable")
+
+        method = request.query.get("method", "").lower()
+
+        try:
+            body = self._body(method, request.query)
+        except KeyError:
+            return web.json_response({"error": 3, "message": "Invalid Method"})
+
+        return web.Response(body=body, content_type="application/json")
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Starts serving and returns the base URL to give AsyncClient"""
+
+        app = web.Application()
+        app.router.add_route("*", "/2.0", self.handle)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        sockets = site._server.sockets  # type: ignore
+        bound_port = sockets[0].getsockname()[1]
+
+        return f"http://{host}:{bound_port}/2.0"
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
@@ -0,0 +1,10 @@
+import lastfm
+
+
+with lastfm.Client("api_key_here") as client:
+    user = client.fetch_user("crygup")
+
+    print(user.playcount)
+
+    for artist in client.map(client.fetch_artist, ["Radiohead", "Bjork", "Low"]):
+        print(artist.name, artist.listeners)
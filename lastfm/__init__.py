@@ -3,9 +3,26 @@ __version__ = "1.0.5"
 from .album import *
 from .artist import *
 from .attr import *
+from .batch import *
+from .cache import *
 from .client import *
+from .connection import *
+from .crawler import *
+from .decoder import *
 from .errors import *
+from .hooks import *
 from .image import *
+from .jobs import *
+from .metrics import *
+from .mirror import *
+from .nowplaying import *
+from .page import *
+from .pool import *
+from .ratelimit import *
+from .retry import *
+from .schema import *
+from .stats import *
+from .sync import *
 from .tags import *
 from .track import *
 from .user import *
@@ -3,13 +3,18 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, List, Optional
 
+from .utils import slotted
+
 if TYPE_CHECKING:
     from .artist import MiniArtist
     from .image import Image
     from .tags import AlbumTag
     from .wiki import AlbumWiki
 
+__all__ = ["Album", "ArtistTopAlbum", "UserRecentTrackAlbum"]
+
 
+@slotted
 @dataclass(frozen=True)
 class Album:
     artist: str
@@ -24,6 +29,7 @@ class Album:
     wiki: Optional[AlbumWiki]
 
 
+@slotted
 @dataclass(frozen=True)
 class ArtistTopAlbum:
     name: str
@@ -33,6 +39,7 @@ class ArtistTopAlbum:
     images: Image
 
 
+@slotted
 @dataclass(frozen=True)
 class UserRecentTrackAlbum:
     musicbrainz_id: Optional[str]
@@ -3,12 +3,15 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, List, Optional
 
+from .utils import slotted
+
 if TYPE_CHECKING:
     from .image import Image
 
 __all__ = ["Artist", "MiniArtist", "SimilarArtist", "SearchArtist"]
 
 
+@slotted
 @dataclass(frozen=True)
 class Artist:
     """Artist's details"""
@@ -25,16 +28,17 @@ class Artist:
     similar: List[ArtistSimilar]
 
 
+@slotted
 @dataclass(frozen=True)
 class ArtistSimilar:
     """Artist from 'similar' attribute in Arist"""
 
     url: str
     name: str
-    name: str
     images: Image
 
 
+@slotted
 @dataclass(frozen=True)
 class SimilarArtist:
     """Artist from client.fetch_similar_artists"""
@@ -47,6 +51,7 @@ class SimilarArtist:
     streamable: str
 
 
+@slotted
 @dataclass(frozen=True)
 class SearchArtist:
     """Artist from client.search_artists"""
@@ -59,6 +64,7 @@ class SearchArtist:
     images: Image
 
 
+@slotted
 @dataclass(frozen=True)
 class MiniArtist:
     name: str
@@ -66,6 +72,7 @@ class MiniArtist:
     url: str
 
 
+@slotted
 @dataclass(frozen=True)
 class UserRecentTrackArtist:
     musicbrainz_id: Optional[str]
@@ -1,6 +1,22 @@
 from dataclasses import dataclass
 
+from .utils import slotted
 
+__all__ = ["PageAttr", "UserRecentTrackAttr"]
+
+
+@slotted
+@dataclass(frozen=True)
+class PageAttr:
+    """Pagination details of a paginated response"""
+
+    page: int
+    per_page: int
+    total_pages: int
+    total: int
+
+
+@slotted
 @dataclass(frozen=True)
 class UserRecentTrackAttr:
     user: str
@@ -0,0 +1,128 @@
+import asyncio
+from dataclasses import dataclass
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .errors import InvalidArguments
+
+__all__ = ["BatchResult", "run_batch"]
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class BatchResult(Generic[K, V]):
+    """Outcome of one lookup in a batch
+
+    Either `result` or `error` is set."""
+
+    key: K
+    result: Optional[V] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> V:
+        """Returns the result or raises the error"""
+
+        if self.error is not None:
+            raise self.error
+
+        return self.result  # type: ignore
+
+
+async def run_batch(
+    keys: Iterable[K],
+    func: Callable[[K], Awaitable[V]],
+    concurrency: int = 10,
+    ordered: bool = False,
+) -> AsyncIterator[BatchResult[K, V]]:
+    """Runs `func` over `keys` with at most `concurrency` calls at once
+
+    Duplicate keys are only looked up once and yield a single result.
+    Results are yielded as they complete, or in the order keys were first
+    seen if `ordered` is True. A failing lookup yields a BatchResult holding
+    the error instead of stopping the batch."""
+
+    if concurrency < 1:
+        raise InvalidArguments("concurrency must be at least 1.")
+
+    seen: Set[K] = set()
+
+    def unique() -> Iterator[K]:
+        for key in keys:
+            if key not in seen:
+                seen.add(key)
+                yield key
+
+    # shared by every worker, each pulls its next key from it
+    work = enumerate(unique())
+    # items are (index, result), None once a worker is done, or the error
+    # raised by `keys` itself
+    queue: "asyncio.Queue[Union[None, Exception, Tuple[int, BatchResult[K, V]]]]"
+    queue = asyncio.Queue(maxsize=concurrency)
+
+    async def worker() -> None:
+        try:
+            for index, key in work:
+                try:
+                    result: BatchResult[K, V] = BatchResult(key, await func(key))
+                except Exception as e:
+                    result = BatchResult(key, error=e)
+
+                await queue.put((index, result))
+        except Exception as e:
+            await queue.put(e)
+        else:
+            await queue.put(None)
+
+    workers: List[asyncio.Task] = [
+        asyncio.ensure_future(worker()) for _ in range(concurrency)
+    ]
+    running = len(workers)
+
+    pending: Dict[int, BatchResult[K, V]] = {}
+    next_index = 0
+
+    try:
+        while running:
+            item = await queue.get()
+
+            if item is None:
+                running -= 1
+                continue
+
+            if isinstance(item, Exception):
+                raise item
+
+            index, result = item
+
+            if not ordered:
+                yield result
+                continue
+
+            pending[index] = result
+
+            while next_index in pending:
+                yield pending.pop(next_index)
+                next_index += 1
+    finally:
+        for task in workers:
+            task.cancel()
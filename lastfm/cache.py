@@ -0,0 +1,263 @@
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .decoder import get_decoder
+from .sqlite import SQLiteDatabase
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCache",
+    "SQLiteCache",
+    "ResponseCache",
+    "DEFAULT_TTLS",
+]
+
+# seconds a response stays fresh, keyed on the lowercased endpoint
+DEFAULT_TTLS: Dict[str, float] = {
+    "user.getinfo": 10 * 60,
+    "user.getrecenttracks": 10,
+    "artist.getinfo": 6 * 60 * 60,
+    "artist.getsimilar": 6 * 60 * 60,
+    "artist.gettoptracks": 60 * 60,
+    "artist.gettopalbums": 60 * 60,
+    "artist.search": 60 * 60,
+    "album.getinfo": 6 * 60 * 60,
+}
+
+# params that don't change the response and are left out of cache keys
+IGNORED_PARAMS = ("api_key", "format", "method")
+
+
+class CacheBackend:
+    """Storage used by ResponseCache
+
+    Subclass this to store responses somewhere else than in memory."""
+
+    async def get(self, key: str) -> Optional[Dict[Any, Any]]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Dict[Any, Any], ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """In memory LRU cache holding at most `max_entries` responses"""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[Any, Any]]]"
+        self._entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, key: str) -> Optional[Dict[Any, Any]]:
+        entry = self._entries.get(key)
+
+        if entry is None:
+            return None
+
+        expires, value = entry
+
+        if expires < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Dict[Any, Any], ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class SQLiteCache(SQLiteDatabase, CacheBackend):
+    """Persistent cache stored in a SQLite database
+
+    The database runs in WAL mode so several worker processes on one host can
+    share the same file. Queries, and encoding and decoding the responses,
+    run on a dedicated thread to keep them off the event loop. Every
+    `compact_every` writes, expired entries are deleted and the oldest ones
+    evicted until at most `max_entries` remain."""
+
+    # lets compacting give freed pages back to the file system
+    pragmas = ("auto_vacuum=INCREMENTAL",)
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 100_000,
+        compact_every: int = 1000,
+    ) -> None:
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.compact_every = compact_every
+
+        self._decode = get_decoder()
+        self._writes = 0
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, payload TEXT NOT NULL, expires REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_expires ON responses (expires)"
+        )
+
+    def _get(self, key: str) -> Optional[Dict[Any, Any]]:
+        row = (
+            self._connect()
+            .execute(
+                "SELECT payload FROM responses WHERE key = ? AND expires > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+
+        return self._decode(row[0].encode()) if row else None
+
+    def _set(self, key: str, value: Dict[Any, Any], ttl: float) -> None:
+        payload = json.dumps(value)
+        conn = self._connect()
+
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, expires) "
+                "VALUES (?, ?, ?)",
+                (key, payload, time.time() + ttl),
+            )
+
+        self._writes += 1
+
+        if self._writes >= self.compact_every:
+            self._compact()
+
+    def _delete(self, key: str) -> None:
+        conn = self._connect()
+
+        with conn:
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def _clear(self) -> None:
+        conn = self._connect()
+
+        with conn:
+            conn.execute("DELETE FROM responses")
+
+    def _compact(self) -> None:
+        conn = self._connect()
+        self._writes = 0
+
+        with conn:
+            conn.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+            # entries closest to expiring are the least valuable to keep
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY expires DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+        # execute() only steps the pragma once, freeing a single page
+        conn.executescript("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    async def get(self, key: str) -> Optional[Dict[Any, Any]]:
+        return await self._run(self._get, key)
+
+    async def set(self, key: str, value: Dict[Any, Any], ttl: float) -> None:
+        await self._run(self._set, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._run(self._delete, key)
+
+    async def clear(self) -> None:
+        await self._run(self._clear)
+
+    async def compact(self) -> None:
+        """Deletes expired entries and shrinks the database file"""
+
+        await self._run(self._compact)
+
+
+class ResponseCache:
+    """Caches decoded responses for AsyncClient
+
+    `ttls` maps lowercased endpoints to seconds, endpoints missing from it use
+    `default_ttl` or aren't cached at all when that is None.
+    Cached responses are shared between callers and must not be mutated."""
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        ttls: Optional[Mapping[str, float]] = None,
+        default_ttl: Optional[float] = None,
+    ) -> None:
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+
+        self.hits = 0
+        self.misses = 0
+
+    def ttl(self, endpoint: str) -> Optional[float]:
+        return self.ttls.get(endpoint.lower(), self.default_ttl)
+
+    def key(self, endpoint: str, params: Mapping[Any, Any]) -> Optional[str]:
+        """Cache key for a request, None if the endpoint isn't cached"""
+
+        ttl = self.ttl(endpoint)
+
+        if not ttl or ttl <= 0:
+            return None
+
+        normalized = sorted(
+            (str(k), str(v))
+            for k, v in params.items()
+            if v is not None and k not in IGNORED_PARAMS
+        )
+
+        return endpoint.lower() + json.dumps(normalized, separators=(",", ":"))
+
+    async def get(self, key: str) -> Optional[Dict[Any, Any]]:
+        value = await self.backend.get(key)
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return value
+
+    async def set(self, key: str, endpoint: str, value: Dict[Any, Any]) -> None:
+        ttl = self.ttl(endpoint)
+
+        if ttl:
+            await self.backend.set(key, value, ttl)
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+    async def close(self) -> None:
+        await self.backend.close()
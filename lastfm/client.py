@@ -1,41 +1,121 @@
-from typing import Any, Dict, List, Optional
+import asyncio
+import time
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 import aiohttp
-from dateutil.parser import parse
 
 __all__ = ["AsyncClient"]
-from .album import Album, ArtistTopAlbum, UserRecentTrackAlbum
-from .artist import (
-    Artist,
-    ArtistSimilar,
-    MiniArtist,
-    SearchArtist,
-    SimilarArtist,
-    UserRecentTrackArtist,
+from . import parsers
+from .album import Album, ArtistTopAlbum
+from .artist import Artist, SearchArtist, SimilarArtist
+from .batch import BatchResult, run_batch
+from .cache import ResponseCache
+from .connection import ConnectionOptions
+from .decoder import Decoder, get_decoder
+from .hooks import ClientObserver
+from .errors import (
+    HTTPException,
+    InvalidArguments,
+    RateLimitExceeded,
+    ServerError,
+    error_from_code,
 )
-from .attr import UserRecentTrackAttr
-from .errors import InvalidArguments
-from .image import Image
-from .tags import AlbumTag
+from .page import Page, paginate
+from .ratelimit import BaseRateLimiter
+from .retry import RetryPolicy
 from .track import ArtistTopTrack, UserRecentTrack
 from .user import User
-from .wiki import AlbumWiki
+from .utils import EntityCache, PageBoundary, to_timestamp
 
 
 class AsyncClient:
+    """Asynchronous last.fm client
+
+    Pass a `rate_limiter` (e.g. `RateLimiter(rate=5, burst=10)`) to schedule
+    requests client side instead of getting throttled by last.fm. Requests
+    made inside `rate_limit_caller(key)` take turns with other callers'.
+
+    Transient failures are retried according to `retry_policy`, pass None to
+    disable retrying.
+
+    Pass a `cache` (e.g. `ResponseCache()`) to reuse responses for repeated
+    lookups. Identical requests made while one is in flight share its result.
+    The cache can be shared between clients, so closing the client leaves it
+    open.
+
+    `connection_options` configures the connection pool of the session the
+    client creates, it's ignored if you pass your own `session`.
+
+    Responses are decoded with `decoder`, which defaults to the fastest JSON
+    library installed (orjson, msgspec, then the standard library).
+
+    Artists, albums and images parsed from recent tracks are shared between
+    tracks, up to `entity_cache_size` of them are kept around.
+
+    `observers` are notified of requests, retries, cache hits and rate limit
+    waits, see ClientObserver and MetricsCollector."""
+
     def __init__(
-        self, api_key: str, session: Optional[aiohttp.ClientSession] = None
+        self,
+        api_key: str,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limiter: Optional[BaseRateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = RetryPolicy(),
+        cache: Optional[ResponseCache] = None,
+        connection_options: Optional[ConnectionOptions] = None,
+        decoder: Optional[Decoder] = None,
+        entity_cache_size: int = 65536,
+        observers: Optional[Iterable[ClientObserver]] = None,
     ) -> None:
         self.session = session
         self.api_key = api_key
-        self.base_url = "http://ws.audioscrobbler.com/2.0"
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.cache = cache
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.connection_options = connection_options or ConnectionOptions()
+        self.base_url = self.connection_options.base_url
+        self.decoder = decoder or get_decoder()
+        self._entities = EntityCache(entity_cache_size)
+        self.observers: List[ClientObserver] = list(observers or ())
 
     async def _create_session(self) -> aiohttp.ClientSession:
         if not self.session:
-            self.session = aiohttp.ClientSession()
+            self.session = self.connection_options.create_session()
 
         return self.session
 
+    async def warmup(self, connections: int = 4) -> int:
+        """Opens `connections` connections to last.fm ahead of time
+
+        Returns how many of them could be opened."""
+
+        self.session = await self._create_session()
+
+        async def connect() -> bool:
+            assert self.session is not None
+
+            try:
+                async with self.session.head(self.base_url) as resp:
+                    await resp.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return False
+
+            return True
+
+        results = await asyncio.gather(*(connect() for _ in range(connections)))
+        return sum(results)
+
     async def __aenter__(self):
         return self
 
@@ -55,20 +135,221 @@ class AsyncClient:
     ) -> Dict[Any, Any]:
 
         self.session = await self._create_session()
+        params = self._build_params(endpoint, params)
+
+        cache = self.cache
+        key = cache.key(endpoint, params) if cache and method == "GET" else None
+
+        if cache is None or key is None:
+            return await self._request_with_retries(method, params, **kwargs)
+
+        data = await cache.get(key)
+
+        if data is not None:
+            for observer in self.observers:
+                observer.on_cache_hit(endpoint)
+
+            return data
+
+        for observer in self.observers:
+            observer.on_cache_miss(endpoint)
+
+        task = self._in_flight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(
+                self._fetch_and_cache(key, endpoint, method, params, **kwargs)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._request_done(key, t))
+
+        # shielded so one caller getting cancelled doesn't fail everyone
+        # waiting on the same response
+        return await asyncio.shield(task)
+
+    async def fetch_raw(
+        self, endpoint: str, params: Optional[Dict[Any, Any]] = None
+    ) -> bytes:
+        """Fetches an endpoint and returns the response body undecoded
+
+        Useful to archive responses or decode them somewhere else. Errors
+        returned by last.fm are still raised, responses are never cached."""
+
+        self.session = await self._create_session()
+        params = self._build_params(endpoint, params)
+
+        return await self._request_with_retries("GET", params, raw=True)
 
+    def _build_params(
+        self, endpoint: str, params: Optional[Dict[Any, Any]]
+    ) -> Dict[Any, Any]:
         params = params or {}
         params.update({"api_key": self.api_key, "format": "json", "method": endpoint})
-        params = {k: v for k, v in params.items() if v is not None}
 
-        async with self.session.request(
-            method, f"{self.base_url}", params=params, **kwargs
-        ) as resp:
-            data: Dict[Any, Any] = await resp.json()
+        return {k: v for k, v in params.items() if v is not None}
 
-            if data.get("error"):
-                raise BaseException(data.get("message"))
+    def _request_done(self, key: str, task: asyncio.Future) -> None:
+        self._in_flight.pop(key, None)
 
-            return data
+        if not task.cancelled():
+            task.exception()  # mark as retrieved if every waiter went away
+
+    async def _fetch_and_cache(
+        self,
+        key: str,
+        endpoint: str,
+        method: str,
+        params: Dict[Any, Any],
+        **kwargs,
+    ) -> Dict[Any, Any]:
+        assert self.cache is not None
+
+        data = await self._request_with_retries(method, params, **kwargs)
+        await self.cache.set(key, endpoint, data)
+
+        return data
+
+    async def _request_with_retries(
+        self, method: str, params: Dict[Any, Any], raw: bool = False, **kwargs
+    ) -> Any:
+        policy = self.retry_policy
+
+        if policy is None:
+            return await self._attempt(method, params, raw, **kwargs)
+
+        deadline = (
+            time.monotonic() + policy.budget if policy.budget is not None else None
+        )
+        attempt = 0
+
+        while True:
+            try:
+                return await self._attempt(method, params, raw, **kwargs)
+            except Exception as error:
+                if attempt >= policy.max_retries or not policy.should_retry(error):
+                    raise
+
+                delay = policy.backoff(attempt)
+
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    raise
+
+                for observer in self.observers:
+                    observer.on_retry(params["method"], attempt, delay, error)
+
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _attempt(
+        self, method: str, params: Dict[Any, Any], raw: bool = False, **kwargs
+    ) -> Any:
+        if self.rate_limiter is None:
+            return await self._send(method, params, raw, **kwargs)
+
+        start = time.monotonic()
+        await self.rate_limiter.acquire()
+
+        try:
+            waited = time.monotonic() - start
+
+            for observer in self.observers:
+                observer.on_rate_limit_wait(params["method"], waited)
+
+            return await self._send(method, params, raw, **kwargs)
+        finally:
+            self.rate_limiter.release()
+
+    async def _send(
+        self,
+        method: str,
+        params: Dict[Any, Any],
+        raw: bool = False,
+        session: Optional[aiohttp.ClientSession] = None,
+        **kwargs,
+    ) -> Any:
+        session = session or self.session
+        assert session is not None
+
+        if not self.observers:
+            async with session.request(
+                method, f"{self.base_url}", params=params, **kwargs
+            ) as resp:
+                body = await resp.read()
+
+            return self._decode(body, resp.status, raw)
+
+        endpoint = params["method"]
+        # observers often log what they're given, keep the key out of it
+        visible = {key: value for key, value in params.items() if key != "api_key"}
+
+        for observer in self.observers:
+            observer.on_request_start(endpoint, visible)
+
+        start = time.perf_counter()
+        status: Optional[int] = None
+        size = 0
+        decode_time = 0.0
+        error: Optional[BaseException] = None
+
+        try:
+            async with session.request(
+                method, f"{self.base_url}", params=params, **kwargs
+            ) as resp:
+                body = await resp.read()
+                status = resp.status
+
+            size = len(body)
+            decode_start = time.perf_counter()
+
+            try:
+                return self._decode(body, status, raw)
+            finally:
+                decode_time = time.perf_counter() - decode_start
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+
+            for observer in self.observers:
+                observer.on_request_end(
+                    endpoint,
+                    elapsed=elapsed,
+                    status=status,
+                    size=size,
+                    decode_time=decode_time,
+                    error=error,
+                )
+
+    def _decode(self, body: bytes, status: int, raw: bool) -> Any:
+        # raw callers only pay for decoding when the body may hold an error,
+        # it's decoded to tell an "error" key from e.g. a track named error
+        if raw and status < 400 and b'"error"' not in body:
+            return body
+
+        try:
+            data: Dict[Any, Any] = self.decoder(body) if body.strip() else {}
+        except ValueError:
+            if status >= 500:
+                raise ServerError(f"last.fm returned HTTP {status}", status=status)
+
+            # e.g. an HTML error page from a proxy in front of last.fm
+            cls = RateLimitExceeded if status == 429 else HTTPException
+
+            if status >= 400:
+                raise cls(f"last.fm returned HTTP {status}", status=status)
+
+            raise
+
+        if isinstance(data, dict) and data.get("error"):
+            raise error_from_code(
+                int(data["error"]), data.get("message", ""), status=status
+            )
+
+        if status >= 500:
+            raise ServerError(f"last.fm returned HTTP {status}", status=status)
+
+        return body if raw else data
 
     async def fetch_user(self, username: str) -> User:
         data = await self._request(
@@ -82,47 +363,64 @@ class AsyncClient:
         artist: Optional[str] = None,
         mbid: Optional[str] = None,
         username: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
     ) -> Artist:
         """Searches an artist
 
-        Artist argument is not required if using mbid argument"""
+        Artist argument is not required if using mbid argument.
+
+        Pass `fields`, names of Artist attributes, to only parse those. The
+        others are None, e.g. `fields=("playcount", "listeners")` skips
+        building the similar artists and images."""
 
         if not artist and not mbid:
             raise InvalidArguments(
                 "You either need to provide artist OR mbid for this function."
             )
 
+        parse = parsers.artist_projection(fields)
+
         results = await self._request(
             "GET",
             endpoint="artist.getInfo",
             params={"artist": artist, "mbid": mbid, "username": username},
         )
-        data: Dict[Any, Any] = results["artist"]
-        stats: Dict[Any, Any] = data["stats"]
 
-        userplaycount = stats.get("userplaycount")
+        return parse(results["artist"])
 
-        def format_data(data: Dict[Any, Any]) -> ArtistSimilar:
-            return ArtistSimilar(
-                url=data["url"],
-                name=data["name"],
-                images=Image(data["image"]),
-            )
+    def fetch_artists(
+        self,
+        artists: Iterable[str],
+        username: Optional[str] = None,
+        mbid: bool = False,
+        concurrency: int = 10,
+        ordered: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[BatchResult[str, Artist]]:
+        """Fetches many artists, `concurrency` at a time
+
+        `artists` are names, or MBIDs if `mbid` is True. Results are yielded as
+        they complete unless `ordered` is True, duplicates are fetched once.
+
+        ```
+        async for result in client.fetch_artists(names):
+            if result.ok:
+                print(result.key, result.result.listeners)
+        ```"""
+
+        if fields is not None:
+            fields = tuple(fields)
+            parsers.artist_projection(fields)
+
+        async def fetch(key: str) -> Artist:
+            if mbid:
+                return await self.fetch_artist(
+                    mbid=key, username=username, fields=fields
+                )
 
-        return Artist(
-            name=data["name"],
-            musicbrainz_id=data.get("mbid"),
-            url=data["url"],
-            images=Image(data["image"]),
-            streamable=data["streamable"],
-            ontour=data["ontour"],
-            listeners=int(stats["listeners"]),
-            playcount=int(stats["playcount"]),
-            similar=[
-                format_data(SimilarData) for SimilarData in data["similar"]["artist"]
-            ],
-            userplaycount=int(userplaycount) if userplaycount else None,
-        )
+            return await self.fetch_artist(artist=key, username=username, fields=fields)
+
+        return run_batch(artists, fetch, concurrency=concurrency, ordered=ordered)
 
     async def fetch_similar_artists(
         self,
@@ -145,24 +443,15 @@ class AsyncClient:
             params={"artist": artist, "mbid": mbid, "limit": limit},
         )
 
-        def format_data(data: Dict[Any, Any]) -> SimilarArtist:
-            return SimilarArtist(
-                name=data["name"],
-                musicbrainz_id=data.get("mbid"),
-                match=data["match"],
-                url=data["url"],
-                images=Image(data["image"]),
-                streamable=data["streamable"],
-            )
-
-        return [format_data(data) for data in results["similarartists"]["artist"]]
+        parse = parsers.similar_artist
+        return [parse(data) for data in results["similarartists"]["artist"]]
 
     async def search_artists(
         self,
         artist: Optional[str] = None,
         limit: Optional[int] = None,
         page: Optional[int] = None,
-    ) -> List[SearchArtist]:
+    ) -> Page[SearchArtist]:
         """Searches for an artists"""
 
         results = await self._request(
@@ -171,19 +460,30 @@ class AsyncClient:
             params={"artist": artist, "limit": limit, "page": page},
         )
 
-        def format_data(data: Dict[Any, Any]) -> SearchArtist:
-            return SearchArtist(
-                name=data["url"],
-                listeners=int(data["listeners"]),
-                musicbrainz_id=data.get("mbid"),
-                url=data["url"],
-                streamable=data["streamable"],
-                images=Image(data["image"]),
-            )
+        data = results["results"]
+        parse = parsers.search_artist
+
+        return Page(
+            [parse(artist) for artist in data["artistmatches"]["artist"]],
+            parsers.search_page_attr(data),
+        )
+
+    def iter_search_artists(
+        self,
+        artist: str,
+        limit: int = 30,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[SearchArtist]:
+        """Iterates over every result of an artist search
 
-        return [
-            format_data(data) for data in results["results"]["artistmatches"]["artist"]
-        ]
+        `limit` is the page size. The next `prefetch` pages are fetched while
+        one is consumed, stops after `max_items` results if given."""
+
+        async def fetch(page: int) -> Page[SearchArtist]:
+            return await self.search_artists(artist, limit=limit, page=page)
+
+        return paginate(fetch, prefetch=prefetch, max_items=max_items)
 
     async def fetch_artist_top_tracks(
         self,
@@ -191,7 +491,7 @@ class AsyncClient:
         mbid: Optional[str] = None,
         limit: Optional[int] = None,
         page: Optional[int] = None,
-    ) -> List[ArtistTopTrack]:
+    ) -> Page[ArtistTopTrack]:
         """Fetches an artist's top tracks
 
         Artist argument is not required if using mbid argument"""
@@ -207,22 +507,33 @@ class AsyncClient:
             params={"artist": artist, "limit": limit, "page": page, "mbid": mbid},
         )
 
-        def format_data(data: Dict[Any, Any]) -> ArtistTopTrack:
-            return ArtistTopTrack(
-                name=data["name"],
-                playcount=int(data["playcount"]),
-                listeners=int(data["listeners"]),
-                url=data["url"],
-                streamable=data["streamable"],
-                artist=MiniArtist(
-                    name=data["artist"]["name"],
-                    musicbrainz_id=data["artist"].get("mbid"),
-                    url=data["artist"]["url"],
-                ),
-                images=Image(data["image"]),
+        data = results["toptracks"]
+        parse = parsers.artist_top_track
+
+        return Page(
+            [parse(track) for track in data["track"]],
+            parsers.page_attr(data["@attr"]),
+        )
+
+    def iter_artist_top_tracks(
+        self,
+        artist: Optional[str] = None,
+        mbid: Optional[str] = None,
+        limit: int = 50,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[ArtistTopTrack]:
+        """Iterates over all of an artist's top tracks, see iter_search_artists"""
+
+        if not artist and not mbid:
+            raise InvalidArguments(
+                "You either need to provide artist OR mbid for this function."
             )
 
-        return [format_data(data) for data in results["toptracks"]["track"]]
+        async def fetch(page: int) -> Page[ArtistTopTrack]:
+            return await self.fetch_artist_top_tracks(artist, mbid, limit, page)
+
+        return paginate(fetch, prefetch=prefetch, max_items=max_items)
 
     async def fetch_artist_top_albums(
         self,
@@ -230,7 +541,7 @@ class AsyncClient:
         mbid: Optional[str] = None,
         limit: Optional[int] = None,
         page: Optional[int] = None,
-    ) -> List[ArtistTopAlbum]:
+    ) -> Page[ArtistTopAlbum]:
         """Fetches an artist's top albums
 
         Artist argument is not required if using mbid argument"""
@@ -246,20 +557,33 @@ class AsyncClient:
             params={"artist": artist, "limit": limit, "page": page, "mbid": mbid},
         )
 
-        def format_data(data: Dict[Any, Any]) -> ArtistTopAlbum:
-            return ArtistTopAlbum(
-                name=data["name"],
-                playcount=data["playcount"],
-                url=data["url"],
-                artist=MiniArtist(
-                    name=data["artist"]["name"],
-                    musicbrainz_id=data["artist"].get("mbid"),
-                    url=data["url"],
-                ),
-                images=Image(data["image"]),
+        data = results["topalbums"]
+        parse = parsers.artist_top_album
+
+        return Page(
+            [parse(album) for album in data["album"]],
+            parsers.page_attr(data["@attr"]),
+        )
+
+    def iter_artist_top_albums(
+        self,
+        artist: Optional[str] = None,
+        mbid: Optional[str] = None,
+        limit: int = 50,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> AsyncIterator[ArtistTopAlbum]:
+        """Iterates over all of an artist's top albums, see iter_search_artists"""
+
+        if not artist and not mbid:
+            raise InvalidArguments(
+                "You either need to provide artist OR mbid for this function."
             )
 
-        return [format_data(data) for data in results["topalbums"]["album"]]
+        async def fetch(page: int) -> Page[ArtistTopAlbum]:
+            return await self.fetch_artist_top_albums(artist, mbid, limit, page)
+
+        return paginate(fetch, prefetch=prefetch, max_items=max_items)
 
     async def fetch_album(
         self,
@@ -267,10 +591,12 @@ class AsyncClient:
         album: Optional[str] = None,
         mbid: Optional[str] = None,
         username: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
     ) -> Album:
         """Fetches info on an album
 
-        Artist and album arguments are not required if using mbid argument"""
+        Artist and album arguments are not required if using mbid argument.
+        `fields` limits parsing to some Album attributes, see fetch_artist."""
         if not mbid:
             if not artist and not album:
                 raise InvalidArguments(
@@ -282,6 +608,8 @@ class AsyncClient:
                     "You need to provide artist AND album for this function"
                 )
 
+        parse = parsers.album_projection(fields)
+
         results = await self._request(
             "GET",
             endpoint="album.getinfo",
@@ -293,43 +621,51 @@ class AsyncClient:
             },
         )
 
-        data: Dict[Any, Any] = results["album"]
+        return parse(results["album"])
 
-        tag_data: Optional[Dict[Any, Any]] = data.get("tags")
-        wiki_data: Optional[Dict[Any, Any]] = data.get("wiki")
+    def fetch_albums(
+        self,
+        albums: Iterable[Tuple[str, str]],
+        username: Optional[str] = None,
+        concurrency: int = 10,
+        ordered: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[BatchResult[Tuple[str, str], Album]]:
+        """Fetches many albums, `concurrency` at a time
+
+        `albums` are (artist, album) pairs. Results are yielded as they
+        complete unless `ordered` is True, duplicates are fetched once."""
+
+        if fields is not None:
+            fields = tuple(fields)
+            parsers.album_projection(fields)
+
+        async def fetch(key: Tuple[str, str]) -> Album:
+            artist, album = key
+            return await self.fetch_album(
+                artist=artist, album=album, username=username, fields=fields
+            )
 
-        tags = (
-            [AlbumTag(url=data["url"], name=data["name"]) for data in tag_data["tag"]]
-            if tag_data
-            else None
-        )
+        return run_batch(albums, fetch, concurrency=concurrency, ordered=ordered)
 
-        wiki: Optional[AlbumWiki] = None
+    def fetch_albums_by_mbid(
+        self,
+        mbids: Iterable[str],
+        username: Optional[str] = None,
+        concurrency: int = 10,
+        ordered: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[BatchResult[str, Album]]:
+        """Same as fetch_albums but looks albums up by MBID"""
 
-        if wiki_data:
-            try:
-                published = parse(wiki_data["published"])
-            except:  # blank except because last.fm api sucks and there are too many things to handle just for me to say its None
-                published = None
-
-            wiki = AlbumWiki(
-                published=published,
-                summary=wiki_data.get("summar"),
-                content=wiki_data.get("content"),
-            )
+        if fields is not None:
+            fields = tuple(fields)
+            parsers.album_projection(fields)
 
-        return Album(
-            artist=data["artist"],
-            musicbrainz_id=data.get("mbid"),
-            tags=tags,
-            playcount=int(data["playcount"]),
-            images=Image(data["image"]),
-            url=data["url"],
-            name=data["name"],
-            userplaycount=data.get("userplaycount"),
-            listeners=int(data["listeners"]),
-            wiki=wiki,
-        )
+        async def fetch(key: str) -> Album:
+            return await self.fetch_album(mbid=key, username=username, fields=fields)
+
+        return run_batch(mbids, fetch, concurrency=concurrency, ordered=ordered)
 
     async def fetch_user_recent_tracks(
         self,
@@ -338,12 +674,123 @@ class AsyncClient:
         page: Optional[int] = None,
         extended: Optional[bool] = None,
         to: Optional[int] = None,
-    ) -> List[UserRecentTrack]:
+        from_: Optional[int] = None,
+    ) -> Page[UserRecentTrack]:
         """Fetches a user's recent tracks
 
-        `to` argument is in UNIX time"""
+        `to` and `from_` arguments are in UNIX time. If the user is listening
+        to something it's the first track and the page's `now_playing` is True."""
 
-        results = await self._request(
+        results = await self.fetch_user_recent_tracks_data(
+            user, limit=limit, page=page, extended=extended, to=to, from_=from_
+        )
+
+        return self.parse_recent_tracks(results)
+
+    async def iter_user_recent_tracks(
+        self,
+        user: str,
+        extended: Optional[bool] = None,
+        to: Optional[int] = None,
+        from_: Optional[int] = None,
+        limit: int = 200,
+        prefetch: int = 2,
+        now_playing: bool = False,
+    ) -> AsyncIterator[UserRecentTrack]:
+        """Iterates over a user's whole scrobble history, newest first
+
+        Pages are fetched `prefetch` at a time so only a bounded number of them
+        are held in memory. `to` is pinned to the current time when not given so
+        scrobbles submitted mid-iteration don't shift the pages underneath us.
+
+        The "now playing" row last.fm prepends to every page is skipped, unless
+        `now_playing` is True in which case it's yielded once before the history."""
+
+        if prefetch < 1:
+            raise InvalidArguments("prefetch must be at least 1.")
+
+        if to is None:
+            to = int(time.time())
+
+        first = await self.fetch_user_recent_tracks_data(
+            user, limit=limit, page=1, extended=extended, to=to, from_=from_
+        )
+        total_pages = int(first["recenttracks"]["@attr"]["totalPages"])
+
+        pending: Deque[asyncio.Task] = deque()
+        next_page = 2
+
+        def schedule() -> None:
+            nonlocal next_page
+
+            while len(pending) < prefetch and next_page <= total_pages:
+                pending.append(
+                    asyncio.ensure_future(
+                        self.fetch_user_recent_tracks_data(
+                            user,
+                            limit=limit,
+                            page=next_page,
+                            extended=extended,
+                            to=to,
+                            from_=from_,
+                        )
+                    )
+                )
+                next_page += 1
+
+        schedule()
+
+        boundary = PageBoundary()
+        results: Optional[Dict[Any, Any]] = first
+        first_page = True
+
+        try:
+            while results is not None:
+                page = self.parse_recent_tracks(results)
+                tracks = iter(page)
+
+                if page.now_playing:
+                    track = next(tracks)
+
+                    if now_playing and first_page:
+                        yield track
+
+                for track in tracks:
+                    # the now playing row was taken off, others should be dated
+                    if track.played_at is None:
+                        continue
+
+                    key = (to_timestamp(track.played_at), track.artist.name, track.name)
+
+                    if boundary.keep(key):
+                        yield track
+
+                boundary.next_page()
+                first_page = False
+                results = None
+
+                if pending:
+                    results = await pending.popleft()
+                    schedule()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def fetch_user_recent_tracks_data(
+        self,
+        user: str,
+        limit: Optional[int] = None,
+        page: Optional[int] = None,
+        extended: Optional[bool] = None,
+        to: Optional[int] = None,
+        from_: Optional[int] = None,
+    ) -> Dict[Any, Any]:
+        """Fetches a page of a user's recent tracks without parsing it
+
+        Useful to store or filter pages as they come, `parse_recent_tracks`
+        turns the response into tracks."""
+
+        return await self._request(
             "GET",
             endpoint="user.getRecentTracks",
             params={
@@ -352,49 +799,18 @@ class AsyncClient:
                 "page": page,
                 "extended": "1" if extended else None,
                 "to": to,
+                "from": from_,
             },
         )
 
-        def format_data(data: Dict[Any, Any]) -> UserRecentTrack:
-            artist_data: Dict[Any, Any] = data["artist"]
-            album_data: Dict[Any, Any] = data["album"]
-            attr_data: Dict[Any, Any] = results["recenttracks"]["@attr"]
+    def parse_recent_tracks(self, results: Dict[Any, Any]) -> Page[UserRecentTrack]:
+        """Parses a decoded user.getRecentTracks response"""
 
-            artist = UserRecentTrackArtist(
-                musicbrainz_id=artist_data.get("mbid"),
-                name=artist_data.get("name") if extended else artist_data.get("#test"),  # type: ignore
-                url=artist_data.get("url"),
-                images=Image(data["image"]) if extended else None,
-            )
+        data = results["recenttracks"]
+        attr = parsers.recent_tracks_attr(data["@attr"])
+        context = parsers.RecentTracksContext(self._entities, attr)
 
-            album = UserRecentTrackAlbum(
-                musicbrainz_id=album_data.get("mbid"), name=album_data["#text"]
-            )
-
-            try:
-                now_playing = bool(data["@attr"]["nowplaying"])
-            except KeyError:
-                now_playing = False
-
-            attr = UserRecentTrackAttr(
-                user=attr_data["user"],
-                total_pages=int(attr_data["totalPages"]),
-                page=int(attr_data["page"]),
-                per_page=int(attr_data["perPage"]),
-                total_scrobbles=int(attr_data["total"]),
-            )
-
-            return UserRecentTrack(
-                artist=artist,
-                musicbrainz_id=data.get("mbid"),
-                name=data["name"],
-                url=data["url"],
-                images=Image(data["image"]),
-                album=album,
-                now_playing=now_playing,
-                loved=True if data.get("loved") == "1" else False,
-                attr=attr,
-                played_at=parse(data["date"]["#text"]) if data.get("date") else None,
-            )
+        parse = parsers.recent_track
+        tracks = [parse(track, context) for track in data["track"]]
 
-        return [format_data(data) for data in results["recenttracks"]["track"]]
+        return Page(tracks, attr, now_playing=bool(tracks) and tracks[0].now_playing)
@@ -0,0 +1,46 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+
+__all__ = ["ConnectionOptions"]
+
+
+@dataclass(frozen=True)
+class ConnectionOptions:
+    """Connection pool settings for the session AsyncClient creates
+
+    `limit` caps the total number of pooled connections and `limit_per_host`
+    the ones to last.fm itself (0 means no limit). Idle connections are kept
+    alive for `keepalive_timeout` seconds and DNS lookups cached for
+    `ttl_dns_cache` seconds. Timeouts are in seconds, None disables them."""
+
+    limit: int = 100
+    limit_per_host: int = 0
+    keepalive_timeout: float = 30.0
+    ttl_dns_cache: Optional[int] = 300
+    https: bool = False
+    connect_timeout: Optional[float] = 10.0
+    read_timeout: Optional[float] = 30.0
+    total_timeout: Optional[float] = None
+
+    @property
+    def base_url(self) -> str:
+        scheme = "https" if self.https else "http"
+        return f"{scheme}://ws.audioscrobbler.com/2.0"
+
+    def create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=self.ttl_dns_cache is not None,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.total_timeout,
+            sock_connect=self.connect_timeout,
+            sock_read=self.read_timeout,
+        )
+
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
@@ -0,0 +1,258 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .client import AsyncClient
+from .errors import InvalidArguments
+from .ratelimit import SharedRateLimiter
+from .utils import PageBoundary, scrobble_key
+
+__all__ = ["Crawler", "CrawlRow"]
+
+# (played_at, artist, album, track), played_at in UNIX time
+CrawlRow = Tuple[int, str, str, str]
+
+
+def _rows(tracks: List[Dict[Any, Any]]) -> List[CrawlRow]:
+    rows: List[CrawlRow] = []
+
+    for track in tracks:
+        date = track.get("date")
+
+        # the now playing row has no date
+        if not date:
+            continue
+
+        artist = track["artist"]
+        rows.append(
+            (
+                int(date["uts"]),
+                artist.get("#text") or artist.get("name", ""),
+                track["album"].get("#text", ""),
+                track["name"],
+            )
+        )
+
+    return rows
+
+
+async def _put(results: Any, item: Tuple[str, Optional[str], Any]) -> None:
+    # the results queue is bounded, putting blocks while the consumer is
+    # behind so it's done off the event loop to keep requests going
+    await asyncio.get_running_loop().run_in_executor(None, results.put, item)
+
+
+async def _crawl_user(
+    client: AsyncClient,
+    user: str,
+    settings: Dict[str, Any],
+    results: Any,
+) -> None:
+    page = total_pages = 1
+    boundary = PageBoundary()
+
+    while page <= total_pages:
+        data = await client.fetch_user_recent_tracks_data(
+            user,
+            limit=settings["limit"],
+            page=page,
+            to=settings["to"],
+            from_=settings["from_"],
+        )
+        recent = data["recenttracks"]
+        total_pages = int(recent["@attr"]["totalPages"])
+
+        rows = _rows(
+            [
+                track
+                for track in recent["track"]
+                if not track.get("date") or boundary.keep(scrobble_key(track))
+            ]
+        )
+        boundary.next_page()
+
+        if rows:
+            await _put(results, ("page", user, rows))
+
+        page += 1
+
+
+async def _crawl(
+    api_key: str,
+    limiter: SharedRateLimiter,
+    tasks: Any,
+    results: Any,
+    settings: Dict[str, Any],
+) -> None:
+    loop = asyncio.get_running_loop()
+    concurrency: int = settings["concurrency"]
+    users: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=concurrency)
+
+    async def feed() -> None:
+        while True:
+            user = await loop.run_in_executor(None, tasks.get)
+
+            if user is None:
+                break
+
+            await users.put(user)
+
+        for _ in range(concurrency):
+            await users.put(None)
+
+    async def work(client: AsyncClient) -> None:
+        while True:
+            user = await users.get()
+
+            if user is None:
+                return
+
+            try:
+                await _crawl_user(client, user, settings, results)
+            except Exception as error:
+                message = f"{type(error).__name__}: {error}"
+                await _put(results, ("error", user, message))
+            else:
+                await _put(results, ("done", user, None))
+
+    async with AsyncClient(
+        api_key, rate_limiter=limiter, **settings["client_options"]
+    ) as client:
+        await asyncio.gather(feed(), *(work(client) for _ in range(concurrency)))
+
+
+def _worker(
+    api_key: str,
+    limiter: SharedRateLimiter,
+    tasks: Any,
+    results: Any,
+    settings: Dict[str, Any],
+) -> None:
+    try:
+        asyncio.run(_crawl(api_key, limiter, tasks, results, settings))
+    finally:
+        results.put(("exit", None, None))
+
+
+class Crawler:
+    """Downloads many users' scrobble histories using several processes
+
+    Decoding responses is what limits a single event loop, so users are
+    handed out to `processes` worker processes, each running its own
+    AsyncClient crawling `concurrency` users at a time. All of them share
+    one SharedRateLimiter of `rate` requests per second.
+
+    Scrobbles are sent back as compact CrawlRow tuples rather than models,
+    a page at a time. Users that failed are kept in `errors` with the
+    reason, `completed` counts users fully downloaded. `to` is pinned to
+    the time the crawl starts unless given.
+
+    Worker processes are spawned, so the crawl must be started from under
+    `if __name__ == "__main__":`.
+
+    ```
+    crawler = Crawler(api_key, processes=8, rate=5)
+    for user, rows in crawler.crawl(users):
+        ...
+    ```"""
+
+    def __init__(
+        self,
+        api_key: str,
+        processes: Optional[int] = None,
+        rate: float = 5.0,
+        burst: int = 10,
+        concurrency: int = 10,
+        limit: int = 200,
+        from_: Optional[int] = None,
+        to: Optional[int] = None,
+        start_method: str = "spawn",
+        client_options: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        if concurrency < 1:
+            raise InvalidArguments("concurrency must be at least 1.")
+
+        self.api_key = api_key
+        self.processes = processes or os.cpu_count() or 1
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.limit = limit
+        self.from_ = from_
+        self.to = to
+        self.start_method = start_method
+        # extra AsyncClient arguments, must be picklable
+        self.client_options = client_options or {}
+
+        self.completed = 0
+        self.errors: Dict[str, str] = {}
+
+    def crawl(self, users: Iterable[str]) -> Iterator[Tuple[str, List[CrawlRow]]]:
+        """Yields (user, rows) for every page of scrobbles, as they arrive
+
+        Each user's pages are yielded newest first, pages of different users
+        are interleaved."""
+
+        context = multiprocessing.get_context(self.start_method)
+        limiter = SharedRateLimiter(self.rate, self.burst, context=context)
+
+        tasks = context.Queue()
+        # bounded so workers wait for a slow consumer instead of piling up
+        results = context.Queue(maxsize=self.processes * self.concurrency * 4)
+
+        settings = {
+            "concurrency": self.concurrency,
+            "limit": self.limit,
+            "from_": self.from_,
+            "to": self.to if self.to is not None else int(time.time()),
+            "client_options": self.client_options,
+        }
+
+        workers = [
+            context.Process(
+                target=_worker,
+                args=(self.api_key, limiter, tasks, results, settings),
+                daemon=True,
+            )
+            for _ in range(self.processes)
+        ]
+
+        for worker in workers:
+            worker.start()
+
+        for user in users:
+            tasks.put(user)
+
+        for _ in workers:
+            tasks.put(None)
+
+        running = len(workers)
+
+        try:
+            while running:
+                try:
+                    kind, user, payload = results.get(timeout=1.0)
+                except queue.Empty:
+                    # a worker killed outright never reports its exit
+                    if all(not worker.is_alive() for worker in workers):
+                        raise RuntimeError("crawler worker processes died")
+
+                    continue
+
+                if kind == "page":
+                    yield user, payload
+                elif kind == "done":
+                    self.completed += 1
+                elif kind == "error":
+                    self.errors[user] = payload
+                else:
+                    running -= 1
+        finally:
+            for worker in workers:
+                if worker.is_alive() and running:
+                    worker.terminate()
+
+                worker.join()
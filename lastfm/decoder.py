@@ -0,0 +1,58 @@
+import json
+from typing import Any, Callable, Dict, Optional
+
+__all__ = ["Decoder", "get_decoder", "available_decoders"]
+
+Decoder = Callable[[bytes], Any]
+
+
+def _stdlib_decoder(data: bytes) -> Any:
+    return json.loads(data)
+
+
+_decoders: Dict[str, Decoder] = {"json": _stdlib_decoder}
+
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    _decoders["orjson"] = orjson.loads
+
+try:
+    import msgspec
+except ImportError:
+    pass
+else:
+    _msgspec_decode = msgspec.json.Decoder().decode
+
+    def _msgspec_decoder(data: bytes) -> Any:
+        try:
+            return _msgspec_decode(data)
+        except msgspec.DecodeError as e:
+            # match json and orjson, which raise a ValueError
+            raise ValueError(str(e)) from e
+
+    _decoders["msgspec"] = _msgspec_decoder
+
+
+def available_decoders() -> Dict[str, Decoder]:
+    """Decoders that can be used, keyed on name"""
+
+    return dict(_decoders)
+
+
+def get_decoder(name: Optional[str] = None) -> Decoder:
+    """Returns the decoder called `name` ("orjson", "msgspec" or "json")
+
+    Without a name the fastest installed one is returned."""
+
+    if name is None:
+        for preferred in ("orjson", "msgspec", "json"):
+            if preferred in _decoders:
+                return _decoders[preferred]
+
+    try:
+        return _decoders[name]  # type: ignore
+    except KeyError:
+        raise ValueError(f"JSON decoder {name!r} is not available") from None
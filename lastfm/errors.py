@@ -1,3 +1,30 @@
+from typing import Dict, Optional, Type
+
+__all__ = [
+    "BaseException",
+    "InvalidArguments",
+    "HTTPException",
+    "TransientError",
+    "NotFound",
+    "InvalidService",
+    "InvalidMethod",
+    "AuthenticationFailed",
+    "InvalidFormat",
+    "InvalidResource",
+    "InvalidSession",
+    "InvalidAPIKey",
+    "InvalidSignature",
+    "SuspendedAPIKey",
+    "OperationFailed",
+    "ServiceOffline",
+    "TemporaryError",
+    "RateLimitExceeded",
+    "ServerError",
+    "ERROR_CODES",
+    "error_from_code",
+]
+
+
 class BaseException(Exception):
     def __init__(self, message: str) -> None:
         self.message = message
@@ -11,5 +38,105 @@ class InvalidArguments(BaseException):
     pass
 
 
-class NotFound(BaseException):
+class HTTPException(BaseException):
+    """An error returned by last.fm
+
+    `code` is last.fm's error code, `status` the HTTP status of the response."""
+
+    def __init__(
+        self, message: str, code: Optional[int] = None, status: Optional[int] = None
+    ) -> None:
+        self.code = code
+        self.status = status
+        super().__init__(message)
+
+
+class TransientError(HTTPException):
+    """An error that might go away if the request is retried"""
+
+
+class NotFound(HTTPException):
+    pass
+
+
+class InvalidService(HTTPException):
+    pass
+
+
+class InvalidMethod(HTTPException):
+    pass
+
+
+class AuthenticationFailed(HTTPException):
+    pass
+
+
+class InvalidFormat(HTTPException):
+    pass
+
+
+class InvalidResource(HTTPException):
+    pass
+
+
+class InvalidSession(HTTPException):
     pass
+
+
+class InvalidAPIKey(HTTPException):
+    pass
+
+
+class InvalidSignature(HTTPException):
+    pass
+
+
+class SuspendedAPIKey(HTTPException):
+    pass
+
+
+class OperationFailed(TransientError):
+    pass
+
+
+class ServiceOffline(TransientError):
+    pass
+
+
+class TemporaryError(TransientError):
+    pass
+
+
+class RateLimitExceeded(TransientError):
+    pass
+
+
+class ServerError(TransientError):
+    """last.fm answered with a 5xx status and no error payload"""
+
+
+ERROR_CODES: Dict[int, Type[HTTPException]] = {
+    2: InvalidService,
+    3: InvalidMethod,
+    4: AuthenticationFailed,
+    5: InvalidFormat,
+    6: NotFound,  # last.fm uses "invalid parameters" for unknown artists, users, ...
+    7: InvalidResource,
+    8: OperationFailed,
+    9: InvalidSession,
+    10: InvalidAPIKey,
+    11: ServiceOffline,
+    13: InvalidSignature,
+    16: TemporaryError,
+    26: SuspendedAPIKey,
+    29: RateLimitExceeded,
+}
+
+
+def error_from_code(
+    code: int, message: str, status: Optional[int] = None
+) -> HTTPException:
+    """Builds the exception matching a last.fm error code"""
+
+    cls = ERROR_CODES.get(code, HTTPException)
+    return cls(message, code=code, status=status)
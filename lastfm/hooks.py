@@ -0,0 +1,46 @@
+from typing import Any, Dict, Optional
+
+__all__ = ["ClientObserver"]
+
+
+class ClientObserver:
+    """Receives events from AsyncClient
+
+    Subclass this, override the events you need and pass instances through
+    AsyncClient's `observers`. Events are called inline with the requests so
+    they should be quick. `endpoint` is the last.fm method, e.g.
+    "artist.getInfo"."""
+
+    def on_request_start(self, endpoint: str, params: Dict[Any, Any]) -> None:
+        """An HTTP request is about to be sent, retries included
+
+        `params` are the query parameters minus the API key."""
+
+    def on_request_end(
+        self,
+        endpoint: str,
+        *,
+        elapsed: float,
+        status: Optional[int],
+        size: int,
+        decode_time: float,
+        error: Optional[BaseException],
+    ) -> None:
+        """An HTTP request finished
+
+        `elapsed` and `decode_time` are in seconds, `size` is the body length
+        in bytes. `status` is None if no response was received."""
+
+    def on_retry(
+        self, endpoint: str, attempt: int, delay: float, error: BaseException
+    ) -> None:
+        """A failed request will be retried in `delay` seconds"""
+
+    def on_cache_hit(self, endpoint: str) -> None:
+        """A response was served from the cache"""
+
+    def on_cache_miss(self, endpoint: str) -> None:
+        """A response wasn't in the cache and will be fetched"""
+
+    def on_rate_limit_wait(self, endpoint: str, waited: float) -> None:
+        """A request waited `waited` seconds for the rate limiter"""
@@ -1,51 +1,107 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 __all__ = ["Image"]
 
+# every image last.fm serves lives under this prefix, followed by a size
+# segment (e.g. "34s" or "300x300") and the same file name for every size
+URL_PREFIX = "https://lastfm.freetls.fastly.net/i/u/"
+
+# size segments per size name, shared by every image with the same layout
+_layouts: Dict[Tuple[Tuple[str, str], ...], Dict[str, str]] = {}
+
 
 class Image:
-    def __init__(self, data: Dict[Any, Any]) -> None:
-        self._data = data
+    """Image in every size last.fm provides
+
+    When all URLs follow last.fm's usual template only the file name is kept,
+    along with a size to path segment mapping shared between images, and URLs
+    are rebuilt on access. Other URLs are kept as they are."""
+
+    __slots__ = ("_file", "_urls")
+
+    def __init__(self, data: List[Dict[Any, Any]]) -> None:
+        self._file, self._urls = self._parse(data)
+
+    @staticmethod
+    def _parse(data: List[Dict[Any, Any]]) -> Tuple[Optional[str], Dict[str, str]]:
+        urls = {
+            image.get("size", ""): image["#text"]
+            for image in data
+            if image.get("#text")
+        }
+
+        file: Optional[str] = None
+        segments: Dict[str, str] = {}
+
+        for size, url in urls.items():
+            if not url.startswith(URL_PREFIX):
+                return None, urls
+
+            segment, separator, name = url[len(URL_PREFIX) :].partition("/")
+
+            if not separator or "/" in name or (file is not None and name != file):
+                return None, urls
+
+            file = name
+            segments[size] = segment
+
+        if file is None:
+            return None, urls
+
+        key = tuple(segments.items())
+        return file, _layouts.setdefault(key, segments)
+
+    def get(self, size: str) -> Optional[str]:
+        """URL of the image in a size, by last.fm's name for it
+
+        e.g. "small", "medium", "large", "extralarge" or "mega"."""
+
+        value = self._urls.get(size)
+
+        if value is None or self._file is None:
+            return value
+
+        return f"{URL_PREFIX}{value}/{self._file}"
+
+    @property
+    def sizes(self) -> Tuple[str, ...]:
+        """Names of the sizes this image is available in"""
+
+        return tuple(self._urls)
 
     @property
     def small(self) -> Optional[str]:
-        try:
-            return self._data[0]["#text"]
-        except (KeyError, IndexError):
-            return None
+        return self.get("small")
 
     @property
     def medium(self) -> Optional[str]:
-        try:
-            return self._data[1]["#text"]
-        except (KeyError, IndexError):
-            return None
+        return self.get("medium")
 
     @property
     def large(self) -> Optional[str]:
-        try:
-            return self._data[2]["#text"]
-        except (KeyError, IndexError):
-            return None
+        return self.get("large")
 
     @property
     def extra_large(self) -> Optional[str]:
-        try:
-            return self._data[3]["#text"]
-        except (KeyError, IndexError):
-            return None
+        return self.get("extralarge")
 
     @property
     def mega(self) -> Optional[str]:
-        try:
-            return self._data[4]["#text"]
-        except (KeyError, IndexError):
-            return None
+        return self.get("mega")
 
     @property
     def extra_mega(self) -> Optional[str]:
         """Not sure what to call this as last.fm doesn't give a proper name it's just empty and is rarely used."""
-        try:
-            return self._data[5]["#text"]
-        except (KeyError, IndexError):
-            return None
+        return self.get("")
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Image):
+            return NotImplemented
+
+        return self._file == other._file and self._urls == other._urls
+
+    def __hash__(self) -> int:
+        return hash((self._file, tuple(self._urls.items())))
+
+    def __repr__(self) -> str:
+        return f"<Image large={self.large!r}>"
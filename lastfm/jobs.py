@@ -0,0 +1,204 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .client import AsyncClient
+from .errors import HTTPException, InvalidArguments, TransientError
+from .utils import PageBoundary, scrobble_key
+
+__all__ = ["DownloadState", "HistoryDownload"]
+
+
+@dataclass
+class DownloadState:
+    """Checkpoint of a HistoryDownload, saved after every page written"""
+
+    user: str
+    to: int
+    from_: Optional[int]
+    limit: int
+    total_pages: Optional[int] = None
+    # next page to write and the output size once every earlier page is in
+    next_page: int = 1
+    offset: int = 0
+    written: int = 0
+    done: bool = False
+    # (played_at, artist, track) of the last page written, to drop rows
+    # repeated across the page boundary
+    last_keys: List[List[Any]] = field(default_factory=list)
+
+
+class HistoryDownload:
+    """Resumable download of a user's whole scrobble history
+
+    Scrobbles are written newest first to `path` as JSON lines, the raw
+    track objects last.fm returns minus the now playing row. `to` is pinned
+    when the job first starts so pages don't shift underneath it.
+
+    Up to `concurrency` pages are fetched at once but written in order, and
+    after each one the output is synced and a DownloadState is saved to
+    `state_path` (`path` + ".state.json" by default). Running the job again
+    with the same arguments truncates anything past the last checkpoint and
+    carries on from there, so only pages that weren't written are fetched
+    again. A failed page is fetched again up to `page_retries` times, errors
+    last.fm won't recover from like an unknown user aren't retried. The job
+    then stops with the error, everything before that page checkpointed.
+
+    ```
+    job = HistoryDownload(client, "crygup", "crygup.jsonl")
+    state = await job.run()
+    ```"""
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        user: str,
+        path: str,
+        state_path: Optional[str] = None,
+        limit: int = 200,
+        from_: Optional[int] = None,
+        concurrency: int = 4,
+        page_retries: int = 3,
+    ) -> None:
+        if concurrency < 1:
+            raise InvalidArguments("concurrency must be at least 1.")
+
+        self.client = client
+        self.user = user
+        self.path = path
+        self.state_path = state_path or f"{path}.state.json"
+        self.limit = limit
+        self.from_ = from_
+        self.concurrency = concurrency
+        self.page_retries = page_retries
+
+        self.state: Optional[DownloadState] = None
+
+    def _load_state(self) -> DownloadState:
+        try:
+            with open(self.state_path, encoding="utf-8") as file:
+                state = DownloadState(**json.load(file))
+        except FileNotFoundError:
+            return DownloadState(
+                user=self.user, to=int(time.time()), from_=self.from_, limit=self.limit
+            )
+
+        if (state.user, state.from_, state.limit) != (
+            self.user,
+            self.from_,
+            self.limit,
+        ):
+            raise InvalidArguments(
+                f"{self.state_path} belongs to a download with other arguments."
+            )
+
+        return state
+
+    def _save_state(self, state: DownloadState) -> None:
+        # written to a temporary file then renamed over the old state so a
+        # crash never leaves a half written checkpoint
+        temporary = f"{self.state_path}.tmp"
+
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(asdict(state), file)
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary, self.state_path)
+
+    def _write_page(self, file: Any, state: DownloadState, lines: List[bytes]) -> None:
+        file.writelines(lines)
+        file.flush()
+        os.fsync(file.fileno())
+
+        state.offset = file.tell()
+        self._save_state(state)
+
+    async def _fetch(self, state: DownloadState, page: int) -> Dict[Any, Any]:
+        return await self.client.fetch_user_recent_tracks_data(
+            state.user, limit=state.limit, page=page, to=state.to, from_=state.from_
+        )
+
+    async def run(self) -> DownloadState:
+        """Downloads every page not written yet, returns the final state"""
+
+        loop = asyncio.get_running_loop()
+        state = self.state = self._load_state()
+
+        if state.done:
+            return state
+
+        mode = "r+b" if os.path.exists(self.path) else "w+b"
+        file = open(self.path, mode)
+
+        pending: Dict[int, asyncio.Future] = {}
+        failures: Dict[int, int] = {}
+
+        try:
+            # drop whatever was written after the last checkpoint
+            file.truncate(state.offset)
+            file.seek(state.offset)
+
+            boundary = PageBoundary(tuple(key) for key in state.last_keys)
+
+            # the page count is only known once the first page came back
+            while state.total_pages is None or state.next_page <= state.total_pages:
+                page = state.next_page
+
+                if state.total_pages is None:
+                    last = page
+                else:
+                    last = min(page + self.concurrency - 1, state.total_pages)
+
+                for ahead in range(page, last + 1):
+                    if ahead not in pending:
+                        pending[ahead] = asyncio.ensure_future(
+                            self._fetch(state, ahead)
+                        )
+
+                try:
+                    data = await pending.pop(page)
+                except Exception as error:
+                    failures[page] = failures.get(page, 0) + 1
+                    # e.g. an unknown user, asking again won't change anything
+                    permanent = isinstance(error, HTTPException) and not isinstance(
+                        error, TransientError
+                    )
+
+                    if permanent or failures[page] > self.page_retries:
+                        raise
+
+                    continue
+
+                recent = data["recenttracks"]
+
+                if state.total_pages is None:
+                    state.total_pages = int(recent["@attr"]["totalPages"])
+
+                lines: List[bytes] = []
+
+                for track in recent["track"]:
+                    if track.get("date") and boundary.keep(scrobble_key(track)):
+                        lines.append(
+                            json.dumps(track, separators=(",", ":")).encode() + b"\n"
+                        )
+
+                boundary.next_page()
+                state.next_page = page + 1
+                state.written += len(lines)
+                state.last_keys = [list(key) for key in boundary.previous]
+
+                await loop.run_in_executor(None, self._write_page, file, state, lines)
+
+            state.done = True
+            await loop.run_in_executor(None, self._save_state, state)
+        finally:
+            for task in pending.values():
+                task.cancel()
+
+            file.close()
+
+        return state
@@ -0,0 +1,199 @@
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Any, DefaultDict, Dict, List, Optional, Sequence, Tuple
+
+from aiohttp import web
+
+from .errors import HTTPException
+from .hooks import ClientObserver
+
+__all__ = ["MetricsCollector"]
+
+# upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+class MetricsCollector(ClientObserver):
+    """Collects per-endpoint request metrics from AsyncClient
+
+    Pass it to AsyncClient's `observers` and scrape it in the Prometheus text
+    format, either from `render()` or the server started by `serve()`.
+
+    ```
+    metrics = MetricsCollector()
+    client = AsyncClient(api_key, observers=[metrics])
+    await metrics.serve(port=9090)
+    ```"""
+
+    def __init__(
+        self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = "lastfm"
+    ) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+
+        self.latency: Dict[str, _Histogram] = {}
+        self.requests: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+        self.errors: DefaultDict[Tuple[str, str], int] = defaultdict(int)
+        self.bytes_received: DefaultDict[str, int] = defaultdict(int)
+        self.decode_seconds: DefaultDict[str, float] = defaultdict(float)
+        self.retries: DefaultDict[str, int] = defaultdict(int)
+        self.cache_hits: DefaultDict[str, int] = defaultdict(int)
+        self.cache_misses: DefaultDict[str, int] = defaultdict(int)
+        self.rate_limit_wait_seconds: DefaultDict[str, float] = defaultdict(float)
+
+        self._runner: Optional[web.AppRunner] = None
+
+    def on_request_end(
+        self,
+        endpoint: str,
+        *,
+        elapsed: float,
+        status: Optional[int],
+        size: int,
+        decode_time: float,
+        error: Optional[BaseException],
+    ) -> None:
+        endpoint = endpoint.lower()
+
+        histogram = self.latency.get(endpoint)
+
+        if histogram is None:
+            histogram = self.latency[endpoint] = _Histogram(self.buckets)
+
+        histogram.observe(elapsed)
+        self.requests[(endpoint, str(status) if status is not None else "none")] += 1
+        self.bytes_received[endpoint] += size
+        self.decode_seconds[endpoint] += decode_time
+
+        if error is not None:
+            if isinstance(error, HTTPException) and error.code is not None:
+                kind = str(error.code)
+            else:
+                kind = type(error).__name__
+
+            self.errors[(endpoint, kind)] += 1
+
+    def on_retry(
+        self, endpoint: str, attempt: int, delay: float, error: BaseException
+    ) -> None:
+        self.retries[endpoint.lower()] += 1
+
+    def on_cache_hit(self, endpoint: str) -> None:
+        self.cache_hits[endpoint.lower()] += 1
+
+    def on_cache_miss(self, endpoint: str) -> None:
+        self.cache_misses[endpoint.lower()] += 1
+
+    def on_rate_limit_wait(self, endpoint: str, waited: float) -> None:
+        self.rate_limit_wait_seconds[endpoint.lower()] += waited
+
+    def render(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+
+        prefix = self.prefix
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help: str) -> str:
+            name = f"{prefix}_{name}"
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            return name
+
+        name = family("request_duration_seconds", "histogram", "HTTP request latency")
+        for endpoint, histogram in sorted(self.latency.items()):
+            cumulative = 0
+
+            for bound, count in zip(self.buckets, histogram.counts):
+                cumulative += count
+                labels = _labels(endpoint=endpoint, le=repr(bound))
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+
+            labels = _labels(endpoint=endpoint, le="+Inf")
+            lines.append(f"{name}_bucket{labels} {histogram.count}")
+            lines.append(f"{name}_sum{_labels(endpoint=endpoint)} {histogram.sum}")
+            lines.append(f"{name}_count{_labels(endpoint=endpoint)} {histogram.count}")
+
+        name = family("requests_total", "counter", "HTTP requests by status")
+        for (endpoint, status), value in sorted(self.requests.items()):
+            lines.append(f"{name}{_labels(endpoint=endpoint, status=status)} {value}")
+
+        name = family(
+            "errors_total", "counter", "Failed requests by last.fm code or error"
+        )
+        for (endpoint, kind), value in sorted(self.errors.items()):
+            lines.append(f"{name}{_labels(endpoint=endpoint, error=kind)} {value}")
+
+        counters: List[Tuple[str, str, Dict[str, Any]]] = [
+            ("received_bytes_total", "Response bytes received", self.bytes_received),
+            (
+                "decode_seconds_total",
+                "Time spent decoding responses",
+                self.decode_seconds,
+            ),
+            ("retries_total", "Retried requests", self.retries),
+            ("cache_hits_total", "Responses served from the cache", self.cache_hits),
+            (
+                "cache_misses_total",
+                "Responses missing from the cache",
+                self.cache_misses,
+            ),
+            (
+                "rate_limit_wait_seconds_total",
+                "Time spent waiting on the rate limiter",
+                self.rate_limit_wait_seconds,
+            ),
+        ]
+
+        for metric, help, values in counters:
+            name = family(metric, "counter", help)
+
+            for endpoint, value in sorted(values.items()):
+                lines.append(f"{name}{_labels(endpoint=endpoint)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            text=self.render(), content_type="text/plain", charset="utf-8"
+        )
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9090) -> None:
+        """Serves the metrics on http://host:port/metrics"""
+
+        app = web.Application()
+        app.router.add_get("/metrics", self._handle)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def close(self) -> None:
+        """Stops the server started by serve()"""
+
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
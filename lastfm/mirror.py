@@ -0,0 +1,282 @@
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from .batch import BatchResult, run_batch
+from .client import AsyncClient
+from .track import UserRecentTrack
+from .sqlite import SQLiteDatabase
+from .utils import to_timestamp
+
+__all__ = ["Scrobble", "ScrobbleStore", "ScrobbleSync", "SyncResult"]
+
+# rows are written to the store this many at a time while syncing
+BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Scrobble:
+    """A scrobble as kept in a ScrobbleStore"""
+
+    played_at: int
+    artist: str
+    album: Optional[str]
+    track: str
+
+
+@dataclass(frozen=True)
+class SyncResult:
+    """Scrobbles a sync added to and removed from a user's store"""
+
+    user: str
+    added: int
+    removed: int
+    high_water: Optional[int]
+
+
+class ScrobbleStore(SQLiteDatabase):
+    """Local SQLite mirror of users' scrobble histories
+
+    Artist, album and track names are stored once in a names table and
+    scrobbles reference them by id, which keeps the file compact. Queries run
+    on a dedicated thread so they don't block the event loop."""
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+
+        self._name_ids: Dict[str, int] = {}
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS names ("
+            "id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS scrobbles ("
+            "user TEXT NOT NULL, played_at INTEGER NOT NULL, "
+            "artist INTEGER NOT NULL, album INTEGER, track INTEGER NOT NULL, "
+            "PRIMARY KEY (user, played_at, artist, track)) WITHOUT ROWID"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sync_state ("
+            "user TEXT PRIMARY KEY, high_water INTEGER, synced_at REAL NOT NULL)"
+        )
+
+    def _name_id(self, name: str) -> int:
+        name_id = self._name_ids.get(name)
+
+        if name_id is None:
+            conn = self._connect()
+            conn.execute("INSERT OR IGNORE INTO names (name) VALUES (?)", (name,))
+            name_id = conn.execute(
+                "SELECT id FROM names WHERE name = ?", (name,)
+            ).fetchone()[0]
+            self._name_ids[name] = name_id
+
+        return name_id
+
+    def _rows(self, user: str, scrobbles: List[Scrobble]) -> List[Tuple[Any, ...]]:
+        return [
+            (
+                user,
+                scrobble.played_at,
+                self._name_id(scrobble.artist),
+                self._name_id(scrobble.album) if scrobble.album else None,
+                self._name_id(scrobble.track),
+            )
+            for scrobble in scrobbles
+        ]
+
+    def _write(
+        self, user: str, scrobbles: List[Scrobble], replace_since: Optional[int]
+    ) -> Tuple[int, int]:
+        conn = self._connect()
+
+        try:
+            with conn:
+                rows = self._rows(user, scrobbles)
+                deleted = 0
+
+                if replace_since is not None:
+                    # only rows that changed are touched, so the counts are
+                    # what the sync actually added and removed
+                    stored = set(
+                        conn.execute(
+                            "SELECT user, played_at, artist, album, track "
+                            "FROM scrobbles WHERE user = ? AND played_at > ?",
+                            (user, replace_since),
+                        )
+                    )
+                    fetched = set(rows)
+
+                    deleted = conn.executemany(
+                        "DELETE FROM scrobbles WHERE user = ? AND played_at = ? "
+                        "AND artist = ? AND track = ?",
+                        [(row[0], row[1], row[2], row[4]) for row in stored - fetched],
+                    ).rowcount
+                    rows = [row for row in rows if row not in stored]
+
+                inserted = conn.executemany(
+                    "INSERT OR IGNORE INTO scrobbles "
+                    "(user, played_at, artist, album, track) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                ).rowcount
+        except BaseException:
+            # ids of names inserted in the transaction are gone
+            self._name_ids.clear()
+            raise
+
+        return inserted, deleted
+
+    def _set_high_water(self, user: str, high_water: Optional[int]) -> None:
+        conn = self._connect()
+
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sync_state (user, high_water, synced_at) "
+                "VALUES (?, ?, ?)",
+                (user, high_water, time.time()),
+            )
+
+    def _high_water(self, user: str) -> Optional[int]:
+        row = (
+            self._connect()
+            .execute("SELECT high_water FROM sync_state WHERE user = ?", (user,))
+            .fetchone()
+        )
+
+        return row[0] if row else None
+
+    def _synced(self, user: str) -> bool:
+        row = (
+            self._connect()
+            .execute("SELECT 1 FROM sync_state WHERE user = ?", (user,))
+            .fetchone()
+        )
+
+        return row is not None
+
+    def _scrobbles(self, user: str, since: Optional[int]) -> List[Scrobble]:
+        rows = self._connect().execute(
+            "SELECT s.played_at, a.name, b.name, t.name FROM scrobbles s "
+            "JOIN names a ON a.id = s.artist "
+            "LEFT JOIN names b ON b.id = s.album "
+            "JOIN names t ON t.id = s.track "
+            "WHERE s.user = ? AND s.played_at >= ? ORDER BY s.played_at",
+            (user, since or 0),
+        )
+
+        return [Scrobble(*row) for row in rows]
+
+    async def synced(self, user: str) -> bool:
+        """Whether a user was synced before"""
+
+        return await self._run(self._synced, user)
+
+    async def write(
+        self,
+        user: str,
+        scrobbles: List[Scrobble],
+        replace_since: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """Inserts scrobbles in one transaction, returns (inserted, deleted)
+
+        With `replace_since`, the user's stored scrobbles played after that
+        time are replaced by `scrobbles`."""
+
+        return await self._run(self._write, user, scrobbles, replace_since)
+
+    async def set_high_water(self, user: str, high_water: Optional[int]) -> None:
+        """Records a sync of a user up to `high_water`"""
+
+        await self._run(self._set_high_water, user, high_water)
+
+    async def high_water(self, user: str) -> Optional[int]:
+        """UNIX time of the newest scrobble synced for a user"""
+
+        return await self._run(self._high_water, user)
+
+    async def scrobbles(self, user: str, since: Optional[int] = None) -> List[Scrobble]:
+        """A user's stored scrobbles, oldest first"""
+
+        return await self._run(self._scrobbles, user, since)
+
+
+class ScrobbleSync:
+    """Incrementally mirrors scrobble histories into a ScrobbleStore
+
+    Each sync only fetches scrobbles newer than what's stored for the user,
+    minus a trailing `window` in seconds which is fetched again and replaced
+    so scrobbles deleted or edited recently are picked up."""
+
+    def __init__(
+        self, client: AsyncClient, store: ScrobbleStore, window: int = 24 * 60 * 60
+    ) -> None:
+        self.client = client
+        self.store = store
+        self.window = window
+
+    def _scrobble(self, track: UserRecentTrack) -> Optional[Scrobble]:
+        if track.played_at is None or not track.artist.name:
+            return None
+
+        return Scrobble(
+            played_at=to_timestamp(track.played_at),
+            artist=track.artist.name,
+            album=track.album.name or None,
+            track=track.name,
+        )
+
+    async def sync_user(self, user: str) -> SyncResult:
+        store = self.store
+
+        synced = await store.synced(user)
+        high_water = await store.high_water(user)
+        since: Optional[int] = None
+
+        if synced:
+            since = max(high_water - self.window, 0) if high_water is not None else 0
+
+        added = removed = 0
+        newest = high_water
+        batch: List[Scrobble] = []
+
+        async for track in self.client.iter_user_recent_tracks(user, from_=since):
+            scrobble = self._scrobble(track)
+
+            if scrobble is None:
+                continue
+
+            batch.append(scrobble)
+
+            if newest is None or scrobble.played_at > newest:
+                newest = scrobble.played_at
+
+            # a first sync can be huge so it's written as it's fetched,
+            # scrobbles that were already stored are ignored if it's restarted
+            if since is None and len(batch) >= BATCH_SIZE:
+                inserted, _ = await store.write(user, batch)
+                added += inserted
+                batch = []
+
+        # an incremental sync only covers the trailing window, which replaces
+        # what's stored for it in one go
+        inserted, removed = await store.write(user, batch, since)
+        added += inserted
+
+        await store.set_high_water(user, newest)
+
+        return SyncResult(
+            user=user,
+            added=added,
+            removed=removed,
+            high_water=newest,
+        )
+
+    def sync_users(
+        self, users: Iterable[str], concurrency: int = 5
+    ) -> AsyncIterator[BatchResult[str, SyncResult]]:
+        """Syncs many users, `concurrency` at a time"""
+
+        return run_batch(users, self.sync_user, concurrency=concurrency)
@@ -0,0 +1,286 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import random
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from .client import AsyncClient
+from .errors import InvalidArguments
+from .track import UserRecentTrack
+
+__all__ = ["NowPlayingEvent", "NowPlayingWatcher"]
+
+
+@dataclass(frozen=True)
+class NowPlayingEvent:
+    """A user started, changed or stopped playing a track"""
+
+    user: str
+    # None when the user stopped listening
+    track: Optional[UserRecentTrack]
+    previous: Optional[UserRecentTrack]
+
+    @property
+    def kind(self) -> str:
+        """Either started, changed or stopped"""
+
+        if self.track is None:
+            return "stopped"
+
+        return "started" if self.previous is None else "changed"
+
+
+class _Watched:
+    __slots__ = ("user", "interval", "digest", "track", "removed")
+
+    def __init__(self, user: str, interval: float) -> None:
+        self.user = user
+        self.interval = interval
+        # hash of the last response body, parsing is skipped while it's equal
+        self.digest: Optional[bytes] = None
+        self.track: Optional[UserRecentTrack] = None
+        self.removed = False
+
+
+def _track_key(track: Optional[UserRecentTrack]) -> Optional[Tuple[str, ...]]:
+    if track is None:
+        return None
+
+    return (track.artist.name or "", track.album.name, track.name)
+
+
+class NowPlayingWatcher:
+    """Watches what users are listening to and emits changes
+
+    Each user's latest track is polled with an uncached limit=1
+    user.getRecentTracks request. Users are polled every `active_interval`
+    seconds while listening. While idle the interval doubles after every
+    unchanged poll, up to `idle_interval`. At most `concurrency` polls run at
+    once.
+
+    Response bodies are hashed and only parsed when they changed since the
+    previous poll. `polls` and `parsed` count how many requests were made
+    and how many of them had to be parsed. Polling stops once iterating over
+    the events ends, or with close().
+
+    ```
+    watcher = NowPlayingWatcher(client, users)
+    async for event in watcher:
+        print(event.user, event.kind, event.track)
+    ```"""
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        users: Iterable[str] = (),
+        active_interval: float = 5.0,
+        idle_interval: float = 60.0,
+        concurrency: int = 50,
+    ) -> None:
+        if active_interval <= 0 or idle_interval < active_interval:
+            raise InvalidArguments(
+                "active_interval must be positive and at most idle_interval."
+            )
+
+        if concurrency < 1:
+            raise InvalidArguments("concurrency must be at least 1.")
+
+        self.client = client
+        self.active_interval = active_interval
+        self.idle_interval = idle_interval
+        self.concurrency = concurrency
+
+        self.polls = 0
+        self.parsed = 0
+        self.errors: Dict[str, Exception] = {}
+
+        self._watched: Dict[str, _Watched] = {}
+        self._schedule: List[Tuple[float, int, _Watched]] = []
+        self._counter = itertools.count()
+        self._events: "Optional[asyncio.Queue[NowPlayingEvent]]" = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._polling: Set[asyncio.Task] = set()
+
+        for user in users:
+            self.add(user)
+
+    def add(self, user: str) -> None:
+        """Starts watching a user, their first poll is spread over the next
+        `active_interval` seconds"""
+
+        if user in self._watched:
+            return
+
+        watched = self._watched[user] = _Watched(user, self.active_interval)
+
+        if self._runner is not None:
+            self._push(watched, random.uniform(0, self.active_interval))
+
+    def remove(self, user: str) -> None:
+        watched = self._watched.pop(user, None)
+
+        if watched is not None:
+            watched.removed = True
+
+    def _push(self, watched: _Watched, delay: float) -> None:
+        due = asyncio.get_running_loop().time() + delay
+        heapq.heappush(self._schedule, (due, next(self._counter), watched))
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _poll(self, watched: _Watched) -> None:
+        self.polls += 1
+
+        try:
+            body = await self.client.fetch_raw(
+                "user.getRecentTracks", {"user": watched.user, "limit": 1}
+            )
+            digest = hashlib.blake2b(body, digest_size=16).digest()
+
+            if digest == watched.digest:
+                page = None
+            else:
+                self.parsed += 1
+                page = self.client.parse_recent_tracks(self.client.decoder(body))
+        except Exception as error:
+            self.errors[watched.user] = error
+            watched.interval = self.idle_interval
+            return
+
+        self.errors.pop(watched.user, None)
+
+        if page is None:
+            if watched.track is None:
+                watched.interval = min(watched.interval * 2, self.idle_interval)
+
+            return
+
+        # only remembered once parsed, so a body that failed is parsed again
+        watched.digest = digest
+        track = page[0] if page.now_playing else None
+
+        if track is None:
+            watched.interval = min(watched.interval * 2, self.idle_interval)
+        else:
+            watched.interval = self.active_interval
+
+        previous = watched.track
+        watched.track = track
+
+        if _track_key(track) != _track_key(previous) and not watched.removed:
+            assert self._events is not None
+            self._events.put_nowait(NowPlayingEvent(watched.user, track, previous))
+
+    async def _run_polls(self, semaphore: asyncio.Semaphore) -> None:
+        loop = asyncio.get_running_loop()
+        assert self._wakeup is not None
+
+        while True:
+            if not self._schedule:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+
+            due, _, watched = self._schedule[0]
+            delay = due - loop.time()
+
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+
+                self._wakeup.clear()
+                continue
+
+            heapq.heappop(self._schedule)
+
+            if watched.removed:
+                continue
+
+            await semaphore.acquire()
+            task = asyncio.ensure_future(self._poll(watched))
+            self._polling.add(task)
+            task.add_done_callback(
+                lambda t, w=watched: self._poll_done(t, w, semaphore)
+            )
+
+    def _poll_done(
+        self, task: asyncio.Task, watched: _Watched, semaphore: asyncio.Semaphore
+    ) -> None:
+        semaphore.release()
+        self._polling.discard(task)
+
+        if task.cancelled():
+            return
+
+        task.exception()
+
+        if not watched.removed:
+            self._push(watched, watched.interval)
+
+    def start(self) -> None:
+        """Starts polling, done automatically when iterating over events"""
+
+        if self._runner is not None:
+            return
+
+        self._events = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+
+        for watched in self._watched.values():
+            self._push(watched, random.uniform(0, self.active_interval))
+
+        self._runner = asyncio.ensure_future(
+            self._run_polls(asyncio.Semaphore(self.concurrency))
+        )
+
+    async def events(self) -> AsyncIterator[NowPlayingEvent]:
+        """Yields events as they happen, stopping the iteration stops polling"""
+
+        self.start()
+        assert self._events is not None and self._runner is not None
+
+        getter: Optional[asyncio.Future] = None
+
+        try:
+            while True:
+                getter = asyncio.ensure_future(self._events.get())
+                await asyncio.wait(
+                    (getter, self._runner), return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not getter.done():
+                    getter.cancel()
+                    # polling stopped, either closed or failed
+                    if not self._runner.cancelled():
+                        self._runner.result()
+                    return
+
+                yield getter.result()
+        finally:
+            if getter is not None:
+                getter.cancel()
+
+            # nobody is left to take events off the queue
+            await self.close()
+
+    def __aiter__(self) -> AsyncIterator[NowPlayingEvent]:
+        return self.events()
+
+    async def close(self) -> None:
+        """Stops polling"""
+
+        tasks = list(self._polling)
+
+        if self._runner is not None:
+            tasks.append(self._runner)
+
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,101 @@
+import asyncio
+from collections import deque
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Iterable,
+    List,
+    Optional,
+    TypeVar,
+)
+
+from .errors import InvalidArguments
+
+__all__ = ["Page", "paginate"]
+
+T = TypeVar("T")
+
+
+class Page(List[T]):
+    """Results from one page of a paginated endpoint
+
+    Behaves as a list of the results. The pagination details are parsed once
+    per page into `attr`, a PageAttr or, for recent tracks, a
+    UserRecentTrackAttr. `now_playing` is True if the first recent track is
+    the user's now playing one rather than a scrobble."""
+
+    __slots__ = ("attr", "now_playing")
+
+    def __init__(self, items: Iterable[T], attr: Any, now_playing: bool = False):
+        super().__init__(items)
+        self.attr = attr
+        self.now_playing = now_playing
+
+    @property
+    def has_next(self) -> bool:
+        return self.attr.page < self.attr.total_pages
+
+
+async def paginate(
+    fetch: Callable[[int], Awaitable[Page[T]]],
+    prefetch: int = 2,
+    max_items: Optional[int] = None,
+) -> AsyncIterator[T]:
+    """Iterates over every result of a paginated endpoint
+
+    `fetch` is given a page number and returns that Page, its `attr` must be
+    a PageAttr. Pages after the first are fetched `prefetch` at a time while
+    the current one is consumed. Stops after the total last.fm reports, on
+    an empty page or after `max_items` results."""
+
+    if prefetch < 1:
+        raise InvalidArguments("prefetch must be at least 1.")
+
+    if max_items is not None and max_items < 1:
+        return
+
+    first = await fetch(1)
+    attr = first.attr
+
+    remaining = attr.total
+    total_pages = attr.total_pages
+
+    if max_items is not None:
+        remaining = min(remaining, max_items)
+
+        if attr.per_page:
+            total_pages = min(total_pages, -(-max_items // attr.per_page))
+
+    pending: Deque[asyncio.Future] = deque()
+    next_page = 2
+
+    def schedule() -> None:
+        nonlocal next_page
+
+        while len(pending) < prefetch and next_page <= total_pages:
+            pending.append(asyncio.ensure_future(fetch(next_page)))
+            next_page += 1
+
+    schedule()
+    page: Optional[Page[T]] = first
+
+    try:
+        while page:
+            for item in page:
+                yield item
+                remaining -= 1
+
+                if remaining <= 0:
+                    return
+
+            page = None
+
+            if pending:
+                page = await pending.popleft()
+                schedule()
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,263 @@
+from typing import Any, Dict, List, Optional
+
+from .album import Album, ArtistTopAlbum, UserRecentTrackAlbum
+from .artist import (
+    Artist,
+    ArtistSimilar,
+    MiniArtist,
+    SearchArtist,
+    SimilarArtist,
+    UserRecentTrackArtist,
+)
+from .attr import PageAttr, UserRecentTrackAttr
+from .image import Image
+from .schema import Field, Projection, compile_parser, list_of
+from .tags import AlbumTag
+from .track import ArtistTopTrack, UserRecentTrack
+from .utils import EntityCache, parse_played_at, parse_published
+from .wiki import AlbumWiki
+
+__all__ = []
+
+
+def _published(text: Any) -> Any:
+    return parse_published(text) if isinstance(text, str) else None
+
+
+page_attr = compile_parser(
+    PageAttr,
+    {
+        "page": Field("page", int),
+        "per_page": Field("perPage", int),
+        "total_pages": Field("totalPages", int),
+        "total": Field("total", int),
+    },
+)
+
+
+def _search_total_pages(data: Dict[Any, Any]) -> int:
+    per_page = int(data["opensearch:itemsPerPage"])
+    total = int(data["opensearch:totalResults"])
+
+    return -(-total // per_page) if per_page else 0
+
+
+# search results are paginated through OpenSearch fields instead of @attr
+search_page_attr = compile_parser(
+    PageAttr,
+    {
+        "page": Field(("opensearch:Query", "startPage"), int),
+        "per_page": Field("opensearch:itemsPerPage", int),
+        "total_pages": Field(convert=_search_total_pages),
+        "total": Field("opensearch:totalResults", int),
+    },
+)
+
+mini_artist = compile_parser(
+    MiniArtist,
+    {
+        "name": "name",
+        "musicbrainz_id": Field("mbid", optional=True),
+        "url": "url",
+    },
+)
+
+artist_similar = compile_parser(
+    ArtistSimilar,
+    {
+        "url": "url",
+        "name": "name",
+        "images": Field("image", Image),
+    },
+)
+
+# fetch_artist and fetch_album can be limited to some fields
+artist_projection = Projection(
+    Artist,
+    {
+        "name": "name",
+        "musicbrainz_id": Field("mbid", optional=True),
+        "url": "url",
+        "images": Field("image", Image),
+        "streamable": "streamable",
+        "ontour": "ontour",
+        "listeners": Field(("stats", "listeners"), int),
+        "playcount": Field(("stats", "playcount"), int),
+        "userplaycount": Field(("stats", "userplaycount"), int, optional=True),
+        "similar": Field(("similar", "artist"), list_of(artist_similar)),
+    },
+)
+artist = artist_projection.full
+
+similar_artist = compile_parser(
+    SimilarArtist,
+    {
+        "name": "name",
+        "musicbrainz_id": Field("mbid", optional=True),
+        "match": "match",
+        "url": "url",
+        "images": Field("image", Image),
+        "streamable": "streamable",
+    },
+)
+
+search_artist = compile_parser(
+    SearchArtist,
+    {
+        "name": "name",
+        "listeners": Field("listeners", int),
+        "musicbrainz_id": Field("mbid", optional=True),
+        "url": "url",
+        "streamable": "streamable",
+        "images": Field("image", Image),
+    },
+)
+
+artist_top_track = compile_parser(
+    ArtistTopTrack,
+    {
+        "name": "name",
+        "playcount": Field("playcount", int),
+        "listeners": Field("listeners", int),
+        "url": "url",
+        "streamable": "streamable",
+        "artist": Field("artist", mini_artist),
+        "images": Field("image", Image),
+    },
+)
+
+artist_top_album = compile_parser(
+    ArtistTopAlbum,
+    {
+        "name": "name",
+        "playcount": Field("playcount", int),
+        "url": "url",
+        "artist": Field("artist", mini_artist),
+        "images": Field("image", Image),
+    },
+)
+
+album_tag = compile_parser(AlbumTag, {"url": "url", "name": "name"})
+
+album_wiki = compile_parser(
+    AlbumWiki,
+    {
+        "published": Field("published", _published, optional=True),
+        "summary": Field("summary", optional=True),
+        "content": Field("content", optional=True),
+    },
+)
+
+album_projection = Projection(
+    Album,
+    {
+        "artist": "artist",
+        "musicbrainz_id": Field("mbid", optional=True),
+        "tags": Field(("tags", "tag"), list_of(album_tag), optional=True),
+        "playcount": Field("playcount", int),
+        "images": Field("image", Image),
+        "url": "url",
+        "name": "name",
+        "userplaycount": Field("userplaycount", int, optional=True),
+        "listeners": Field("listeners", int),
+        "wiki": Field("wiki", album_wiki, optional=True),
+    },
+)
+album = album_projection.full
+
+
+class RecentTracksContext:
+    """State shared by every track of a user.getRecentTracks page"""
+
+    __slots__ = ("entities", "attr")
+
+    def __init__(self, entities: EntityCache, attr: UserRecentTrackAttr) -> None:
+        self.entities = entities
+        self.attr = attr
+
+
+def interned_image(data: List[Dict[Any, Any]], entities: EntityCache) -> Image:
+    key = ("image",) + tuple(image.get("#text") for image in data)
+    return entities.get(key, lambda: Image(data))
+
+
+def _recent_image(data: List[Dict[Any, Any]], context: RecentTracksContext) -> Image:
+    return interned_image(data, context.entities)
+
+
+def _recent_artist(
+    data: Dict[Any, Any], context: RecentTracksContext
+) -> UserRecentTrackArtist:
+    # extended responses name the artist in "name", others in "#text"
+    image_data: Optional[List[Dict[Any, Any]]] = data.get("image")
+    key = (
+        "artist",
+        data.get("mbid") or None,
+        data.get("name") or data.get("#text"),
+        data.get("url"),
+        interned_image(image_data, context.entities) if image_data else None,
+    )
+
+    return context.entities.get(
+        key,
+        lambda: UserRecentTrackArtist(
+            musicbrainz_id=key[1], name=key[2], url=key[3], images=key[4]
+        ),
+    )
+
+
+def _recent_album(
+    data: Dict[Any, Any], context: RecentTracksContext
+) -> UserRecentTrackAlbum:
+    key = ("album", data.get("mbid") or None, data["#text"])
+
+    return context.entities.get(
+        key, lambda: UserRecentTrackAlbum(musicbrainz_id=key[1], name=key[2])
+    )
+
+
+def _recent_text(data: str, context: RecentTracksContext) -> str:
+    # names and URLs repeat across pages, sharing them through the bounded
+    # entity cache keeps memory capped unlike sys.intern
+    return context.entities.get(("text", data), lambda: data)
+
+
+def _now_playing(data: Dict[Any, Any]) -> bool:
+    attr = data.get("@attr")
+    return bool(attr and attr.get("nowplaying"))
+
+
+def _loved(data: Dict[Any, Any]) -> bool:
+    return data.get("loved") == "1"
+
+
+def _attr(data: Dict[Any, Any], context: RecentTracksContext) -> UserRecentTrackAttr:
+    return context.attr
+
+
+recent_tracks_attr = compile_parser(
+    UserRecentTrackAttr,
+    {
+        "user": "user",
+        "total_pages": Field("totalPages", int),
+        "page": Field("page", int),
+        "per_page": Field("perPage", int),
+        "total_scrobbles": Field("total", int),
+    },
+)
+
+recent_track = compile_parser(
+    UserRecentTrack,
+    {
+        "artist": Field("artist", _recent_artist, context=True),
+        "musicbrainz_id": Field("mbid", optional=True),
+        "name": Field("name", _recent_text, context=True),
+        "url": Field("url", _recent_text, context=True),
+        "images": Field("image", _recent_image, context=True),
+        "album": Field("album", _recent_album, context=True),
+        "now_playing": Field(convert=_now_playing),
+        "loved": Field(convert=_loved),
+        "attr": Field(convert=_attr, context=True),
+        "played_at": Field("date", parse_played_at, optional=True),
+    },
+)
@@ -0,0 +1,249 @@
+import hashlib
+import time
+from bisect import bisect
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import aiohttp
+
+from .client import AsyncClient
+from .errors import HTTPException, InvalidArguments
+from .ratelimit import BaseRateLimiter, RateLimiter
+
+__all__ = ["ClientPool", "PoolMember"]
+
+ROUTING = ("least_loaded", "hash")
+
+# error codes meaning a key shouldn't be used for a while
+SUSPENDED_KEY = 26
+RATE_LIMIT_EXCEEDED = 29
+
+# params identifying what a request is about, used by hash routing
+ROUTING_PARAMS = ("user", "artist", "mbid")
+
+# points every key gets on the hash ring
+RING_REPLICAS = 64
+
+
+class PoolMember:
+    """One API key of a ClientPool and its accounting"""
+
+    __slots__ = (
+        "api_key",
+        "rate_limiter",
+        "session_index",
+        "in_flight",
+        "requests",
+        "errors",
+        "quarantined_until",
+    )
+
+    def __init__(
+        self, api_key: str, rate_limiter: BaseRateLimiter, session_index: int
+    ) -> None:
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter
+        self.session_index = session_index
+
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        # time.monotonic() until which the key isn't used
+        self.quarantined_until = 0.0
+
+    @property
+    def quarantined(self) -> bool:
+        return self.quarantined_until > time.monotonic()
+
+    def __repr__(self) -> str:
+        return (
+            f"<PoolMember api_key={self.api_key[:6]}... in_flight={self.in_flight} "
+            f"requests={self.requests} quarantined={self.quarantined}>"
+        )
+
+
+class ClientPool(AsyncClient):
+    """AsyncClient spreading requests over several API keys
+
+    Every key gets its own rate limiter, built by `rate_limiter_factory`, so
+    throughput grows with the number of keys. Requests go to the key with
+    the fewest requests in flight, or with `routing="hash"` to a key picked
+    by consistent hashing of the user (or artist) requested, so the same
+    user keeps hitting the same key.
+
+    A key answering with error 29 (rate limit exceeded) is set aside for
+    `quarantine` seconds, one answering with error 26 (suspended key) for
+    `suspended_quarantine` seconds, and the request is sent again with
+    another key. If every key is set aside the one coming back soonest is
+    used.
+
+    Keys are spread over `sessions` connection pools. Other options are the
+    same as AsyncClient's."""
+
+    def __init__(
+        self,
+        api_keys: Sequence[str],
+        routing: str = "least_loaded",
+        rate_limiter_factory: Callable[[], BaseRateLimiter] = RateLimiter,
+        sessions: int = 1,
+        quarantine: float = 60.0,
+        suspended_quarantine: float = 3600.0,
+        **options: Any,
+    ) -> None:
+        if not api_keys:
+            raise InvalidArguments("At least one API key is required.")
+
+        if routing not in ROUTING:
+            raise InvalidArguments(f"routing must be one of {', '.join(ROUTING)}")
+
+        if sessions < 1:
+            raise InvalidArguments("sessions must be at least 1.")
+
+        if "rate_limiter" in options:
+            raise InvalidArguments(
+                "ClientPool rate limits every key, use rate_limiter_factory."
+            )
+
+        super().__init__(api_keys[0], **options)
+
+        self.routing = routing
+        self.quarantine = quarantine
+        self.suspended_quarantine = suspended_quarantine
+        self.members = [
+            PoolMember(key, rate_limiter_factory(), index % sessions)
+            for index, key in enumerate(dict.fromkeys(api_keys))
+        ]
+
+        self._sessions: List[Optional[aiohttp.ClientSession]] = [None] * sessions
+        self._next = 0
+
+        ring: List[Tuple[int, int]] = []
+
+        for index, member in enumerate(self.members):
+            for replica in range(RING_REPLICAS):
+                ring.append((self._hash(f"{member.api_key}:{replica}"), index))
+
+        ring.sort()
+        self._ring_points = [point for point, _ in ring]
+        self._ring_members = [self.members[index] for _, index in ring]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def _session(self, member: PoolMember) -> aiohttp.ClientSession:
+        # the first pool is the client's own session, the others are created
+        # with the same connection options
+        if member.session_index == 0:
+            assert self.session is not None
+            return self.session
+
+        session = self._sessions[member.session_index]
+
+        if session is None:
+            session = self.connection_options.create_session()
+            self._sessions[member.session_index] = session
+
+        return session
+
+    async def close(self) -> None:
+        for session in self._sessions[1:]:
+            if session is not None:
+                await session.close()
+
+        await super().close()
+
+    def _least_loaded(self, members: List[PoolMember]) -> PoolMember:
+        # rotate the starting point so ties are spread round robin
+        start = self._next = (self._next + 1) % len(members)
+        rotated = members[start:] + members[:start]
+
+        return min(rotated, key=lambda member: member.in_flight)
+
+    def _route(self, params: Dict[Any, Any]) -> PoolMember:
+        healthy = [member for member in self.members if not member.quarantined]
+
+        if not healthy:
+            return min(self.members, key=lambda member: member.quarantined_until)
+
+        if self.routing == "hash":
+            key = next(
+                (str(params[name]) for name in ROUTING_PARAMS if params.get(name)),
+                None,
+            )
+
+            if key is not None:
+                start = bisect(self._ring_points, self._hash(key))
+                size = len(self._ring_members)
+
+                # first healthy key clockwise from the request's point
+                for offset in range(size):
+                    member = self._ring_members[(start + offset) % size]
+
+                    if not member.quarantined:
+                        return member
+
+        return self._least_loaded(healthy)
+
+    def _quarantine(self, member: PoolMember, error: HTTPException) -> bool:
+        if error.code == SUSPENDED_KEY:
+            duration = self.suspended_quarantine
+        elif error.code == RATE_LIMIT_EXCEEDED:
+            duration = self.quarantine
+        else:
+            return False
+
+        member.quarantined_until = time.monotonic() + duration
+        return True
+
+    async def _attempt(
+        self, method: str, params: Dict[Any, Any], raw: bool = False, **kwargs
+    ) -> Any:
+        # every key gets one go before the error is left to the retry policy
+        attempts = 0
+
+        while True:
+            member = self._route(params)
+            member.in_flight += 1
+            attempts += 1
+
+            try:
+                return await self._attempt_with(member, method, params, raw, **kwargs)
+            except Exception as error:
+                member.errors += 1
+
+                if (
+                    not isinstance(error, HTTPException)
+                    or not self._quarantine(member, error)
+                    or attempts >= len(self.members)
+                    or all(m.quarantined for m in self.members)
+                ):
+                    raise
+            finally:
+                member.in_flight -= 1
+
+    async def _attempt_with(
+        self,
+        member: PoolMember,
+        method: str,
+        params: Dict[Any, Any],
+        raw: bool,
+        **kwargs,
+    ) -> Any:
+        params = {**params, "api_key": member.api_key}
+
+        start = time.monotonic()
+        await member.rate_limiter.acquire()
+
+        try:
+            waited = time.monotonic() - start
+
+            for observer in self.observers:
+                observer.on_rate_limit_wait(params["method"], waited)
+
+            member.requests += 1
+            return await self._send(
+                method, params, raw, session=self._session(member), **kwargs
+            )
+        finally:
+            member.rate_limiter.release()
@@ -0,0 +1,291 @@
+import asyncio
+import multiprocessing
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Hashable, Iterator, Optional
+
+__all__ = [
+    "BaseRateLimiter",
+    "RateLimiter",
+    "RateLimiterStats",
+    "SharedRateLimiter",
+    "rate_limit_caller",
+]
+
+_caller: "ContextVar[Hashable]" = ContextVar("lastfm_rate_limit_caller", default=None)
+
+
+@contextmanager
+def rate_limit_caller(key: Hashable) -> Iterator[None]:
+    """Makes requests sent from inside the block queue as caller `key`
+
+    Tasks started inside the block keep the caller, so wrapping a gather
+    is enough.
+
+    ```
+    with rate_limit_caller("bot"):
+        await asyncio.gather(*(client.fetch_artist(name) for name in names))
+    ```"""
+
+    token = _caller.set(key)
+
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+
+@dataclass(frozen=True)
+class RateLimiterStats:
+    """Snapshot of a rate limiter's counters"""
+
+    queue_depth: int
+    in_flight: int
+    total_requests: int
+    total_wait: float
+    max_wait: float
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.total_requests if self.total_requests else 0.0
+
+
+class BaseRateLimiter:
+    """Interface AsyncClient uses to schedule requests
+
+    Subclass this and override acquire/release to plug in your own scheduler."""
+
+    async def acquire(self) -> None:
+        raise NotImplementedError
+
+    def release(self) -> None:
+        raise NotImplementedError
+
+    @property
+    def stats(self) -> RateLimiterStats:
+        raise NotImplementedError
+
+    async def __aenter__(self) -> None:
+        await self.acquire()
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.release()
+
+
+class RateLimiter(BaseRateLimiter):
+    """Token bucket scheduler
+
+    Allows `rate` requests per second on average with bursts of up to `burst`
+    requests, and at most `max_concurrent` requests in flight at once.
+
+    Waiting requests are queued per caller and callers take turns, so one
+    caller firing hundreds of requests doesn't hold up the others. The caller
+    is the `key` given to acquire, or the one set with `rate_limit_caller`
+    for requests made through a client. Requests of the same caller are
+    served in the order they arrived."""
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 10,
+        max_concurrent: Optional[int] = None,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+        # callers with requests waiting, in the order they get their next turn
+        self._queues: Dict[Hashable, Deque[asyncio.Future]] = {}
+        # created lazily so the limiter can be built outside of a running loop
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._released: Optional[asyncio.Event] = None
+
+        self._waiting = 0
+        self._in_flight = 0
+        self._total_requests = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _full(self) -> bool:
+        if self.max_concurrent is None:
+            return False
+
+        return self._in_flight >= self.max_concurrent
+
+    async def _dispatch(self) -> None:
+        if self._released is None:
+            self._released = asyncio.Event()
+
+        while self._queues:
+            if self._full():
+                self._released.clear()
+                await self._released.wait()
+                continue
+
+            self._refill()
+
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                continue
+
+            # the caller whose turn it is gets the token and goes to the back
+            key = next(iter(self._queues))
+            queue = self._queues.pop(key)
+            waiter = queue.popleft()
+
+            if queue:
+                self._queues[key] = queue
+
+            # cancelled while waiting
+            if waiter.done():
+                continue
+
+            self._tokens -= 1
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    async def _take_token(self, key: Hashable) -> None:
+        self._refill()
+
+        if not self._queues and self._tokens >= 1 and not self._full():
+            self._tokens -= 1
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append(waiter)
+
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # given a turn just as it was cancelled, hand the slot back
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+
+            raise
+
+    async def acquire(self, key: Hashable = None) -> None:
+        start = time.monotonic()
+        self._waiting += 1
+
+        try:
+            await self._take_token(key if key is not None else _caller.get())
+        finally:
+            self._waiting -= 1
+
+        waited = time.monotonic() - start
+        self._total_requests += 1
+        self._total_wait += waited
+        self._max_wait = max(self._max_wait, waited)
+
+    def release(self) -> None:
+        self._in_flight -= 1
+
+        if self._released is not None:
+            self._released.set()
+
+    @property
+    def stats(self) -> RateLimiterStats:
+        return RateLimiterStats(
+            queue_depth=self._waiting,
+            in_flight=self._in_flight,
+            total_requests=self._total_requests,
+            total_wait=self._total_wait,
+            max_wait=self._max_wait,
+        )
+
+
+class SharedRateLimiter(BaseRateLimiter):
+    """Rate limiter shared between processes
+
+    Implements the generic cell rate algorithm over a single shared float, the
+    theoretical arrival time of the next request, so every process using it
+    draws from one budget of `rate` requests per second with bursts of up to
+    `burst`. Create it before starting the processes and hand it to them as a
+    process argument. `context` is the multiprocessing context they're
+    started from."""
+
+    def __init__(
+        self, rate: float = 5.0, burst: int = 10, context: Optional[Any] = None
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be greater than 0")
+
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+
+        self.rate = rate
+        self.burst = burst
+
+        self._interval = 1 / rate
+        self._tolerance = (burst - 1) * self._interval
+        # wall clock time, as monotonic clocks aren't comparable between
+        # processes on every platform
+        self._tat = (context or multiprocessing).Value("d", 0.0)
+
+        self._waiting = 0
+        self._in_flight = 0
+        self._total_requests = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _reserve(self) -> float:
+        # only held for a few arithmetic operations, so it's fine to take it
+        # from the event loop
+        with self._tat.get_lock():
+            now = time.time()
+            tat = max(self._tat.value, now)
+            self._tat.value = tat + self._interval
+
+        return max(0.0, tat - self._tolerance - now)
+
+    async def acquire(self) -> None:
+        self._waiting += 1
+
+        try:
+            delay = self._reserve()
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        self._total_requests += 1
+        self._total_wait += delay
+        self._max_wait = max(self._max_wait, delay)
+
+    def release(self) -> None:
+        self._in_flight -= 1
+
+    @property
+    def stats(self) -> RateLimiterStats:
+        """Counters of the current process"""
+
+        return RateLimiterStats(
+            queue_depth=self._waiting,
+            in_flight=self._in_flight,
+            total_requests=self._total_requests,
+            total_wait=self._total_wait,
+            max_wait=self._max_wait,
+        )
@@ -0,0 +1,40 @@
+import asyncio
+import random
+from dataclasses import dataclass
+from typing import Optional, Tuple, Type
+
+import aiohttp
+
+from .errors import TransientError
+
+__all__ = ["RetryPolicy"]
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How AsyncClient retries failed requests
+
+    Transient last.fm errors (8, 11, 16, 29), 5xx responses and connection
+    errors are retried up to `max_retries` times with jittered exponential
+    backoff. `budget` caps the total seconds a single call may spend
+    retrying, so tail latency stays bounded."""
+
+    max_retries: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    budget: Optional[float] = 20.0
+
+    retry_on: Tuple[Type[BaseException], ...] = (
+        TransientError,
+        aiohttp.ClientConnectionError,
+        aiohttp.ClientPayloadError,
+        asyncio.TimeoutError,
+    )
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number `attempt` (starting at 0), with full jitter"""
+
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def should_retry(self, error: BaseException) -> bool:
+        return isinstance(error, self.retry_on)
@@ -0,0 +1,207 @@
+from dataclasses import fields as dataclass_fields
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .errors import InvalidArguments
+
+__all__ = []
+
+Parser = Callable[..., Any]
+
+
+class Field:
+    """Where a model field comes from in a response
+
+    `path` is the key, or tuple of keys, leading to the value. With no path
+    the whole object being parsed is used. `convert` is applied to the value,
+    and is also given the parser's context if `context` is True.
+
+    Optional fields use .get() and are None when the value is missing or
+    empty, `convert` is only applied to values that are present."""
+
+    __slots__ = ("path", "convert", "optional", "context")
+
+    def __init__(
+        self,
+        path: Union[None, str, Tuple[str, ...]] = None,
+        convert: Optional[Callable[..., Any]] = None,
+        optional: bool = False,
+        context: bool = False,
+    ) -> None:
+        if isinstance(path, str):
+            path = (path,)
+
+        self.path: Tuple[str, ...] = path or ()
+        self.convert = convert
+        self.optional = optional
+        self.context = context
+
+
+def list_of(parser: Parser) -> Parser:
+    """Converter parsing every item of a list with `parser`
+
+    last.fm sends a lone object instead of a list when there's one item, so
+    that is handled too."""
+
+    def parse_list(data: Any, context: Any = None) -> List[Any]:
+        if isinstance(data, dict):
+            data = [data]
+
+        return [parser(item, context) for item in data]
+
+    return parse_list
+
+
+def _missing(value: Any) -> bool:
+    return value is None or value == ""
+
+
+def _get(data: Any, path: Tuple[str, ...]) -> Any:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+
+        data = data.get(key)
+
+    return data
+
+
+def compile_parser(
+    model: type,
+    schema: Mapping[str, Union[str, Field]],
+    name: Optional[str] = None,
+    only: Optional[FrozenSet[str]] = None,
+) -> Parser:
+    """Builds a function turning a response object into `model`
+
+    `schema` maps every field of the model to a Field, or to a key for plain
+    required values. The function is generated once as straight line code,
+    so parsing doesn't pay for walking the schema. It's called as
+    `parser(data, context=None)`.
+
+    If `only` is given, fields not in it aren't read at all and are None."""
+
+    model_fields = [f.name for f in dataclass_fields(model)]
+    missing = set(model_fields) - set(schema)
+    unknown = set(schema) - set(model_fields)
+
+    if missing or unknown:
+        raise TypeError(
+            f"schema for {model.__name__} doesn't match its fields "
+            f"(missing: {sorted(missing)}, unknown: {sorted(unknown)})"
+        )
+
+    namespace: Dict[str, Any] = {
+        "_model": model,
+        "_missing": _missing,
+        "_get": _get,
+    }
+    lines: List[str] = []
+    arguments: List[str] = []
+
+    for field_name in model_fields:
+        field = schema[field_name]
+
+        if only is not None and field_name not in only:
+            arguments.append(f"        {field_name}=None,")
+            continue
+
+        if isinstance(field, str):
+            field = Field(field)
+
+        if field.convert is not None:
+            namespace[f"_convert_{field_name}"] = field.convert
+
+        convert_args = ", context" if field.context else ""
+
+        if not field.path:
+            value = "data"
+        elif field.optional:
+            if len(field.path) == 1:
+                value = f"data.get({field.path[0]!r})"
+            else:
+                value = f"_get(data, {field.path!r})"
+        else:
+            value = "data" + "".join(f"[{key!r}]" for key in field.path)
+
+        if field.convert is None:
+            expression = value
+        elif field.optional:
+            lines.append(f"    _{field_name} = {value}")
+            expression = (
+                f"None if _missing(_{field_name}) "
+                f"else _convert_{field_name}(_{field_name}{convert_args})"
+            )
+        else:
+            expression = f"_convert_{field_name}({value}{convert_args})"
+
+        if field.optional and field.convert is None:
+            expression = f"{expression} or None"
+
+        arguments.append(f"        {field_name}={expression},")
+
+    function_name = name or f"parse_{model.__name__}"
+    source = "\n".join(
+        [f"def {function_name}(data, context=None):"]
+        + lines
+        + ["    return _model("]
+        + arguments
+        + ["    )"]
+    )
+
+    exec(compile(source, f"<parser {model.__name__}>", "exec"), namespace)
+
+    parser = namespace[function_name]
+    parser.__source__ = source
+    return parser
+
+
+class Projection:
+    """Parsers of a model restricted to some of its fields
+
+    Calling it with an iterable of field names returns a parser which only
+    fills those in, compiled the first time that set of fields is asked
+    for. None returns the parser of the whole model."""
+
+    def __init__(self, model: type, schema: Mapping[str, Union[str, Field]]) -> None:
+        self.model = model
+        self.schema = schema
+        self.full = compile_parser(model, schema)
+        self.names = frozenset(schema)
+
+        self._parsers: Dict[FrozenSet[str], Parser] = {}
+
+    def __call__(self, fields: Optional[Iterable[str]] = None) -> Parser:
+        if fields is None:
+            return self.full
+
+        if isinstance(fields, str):
+            fields = (fields,)
+
+        key = frozenset(fields)
+        parser = self._parsers.get(key)
+
+        if parser is None:
+            unknown = key - self.names
+
+            if unknown:
+                raise InvalidArguments(
+                    f"Unknown {self.model.__name__} fields: "
+                    f"{', '.join(sorted(unknown))}"
+                )
+
+            parser = self._parsers[key] = compile_parser(
+                self.model, self.schema, only=key
+            )
+
+        return parser
@@ -0,0 +1,54 @@
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+__all__ = []
+
+T = TypeVar("T")
+
+
+class SQLiteDatabase:
+    """SQLite database used from a dedicated thread
+
+    The connection is opened on first use in WAL mode, so several processes
+    can share the file, and `_setup` creates the tables. `pragmas` are set
+    before that, as some like auto_vacuum only apply to a new file. Queries
+    go through `_run` so they don't block the event loop."""
+
+    pragmas: Tuple[str, ...] = ()
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _setup(self, conn: sqlite3.Connection) -> None:
+        pass
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+
+            for pragma in self.pragmas:
+                conn.execute(f"PRAGMA {pragma}")
+
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._setup(conn)
+            conn.commit()
+            self._conn = conn
+
+        return self._conn
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._run(self._conn.close)
+            self._conn = None
+
+        self._executor.shutdown(wait=False)
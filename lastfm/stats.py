@@ -0,0 +1,298 @@
+from array import array
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from .errors import InvalidArguments
+from .utils import to_timestamp
+
+if TYPE_CHECKING:
+    from .track import UserRecentTrack
+
+__all__ = ["ListeningStats", "Streak"]
+
+DAY = 24 * 60 * 60
+WEEK = 7 * DAY
+# 1970-01-01 was a thursday, shift epochs so weeks start on monday
+WEEK_OFFSET = 3 * DAY
+
+COLUMNS = ("artist", "album", "track")
+
+# numpy is only imported once stats are used, it's slow to import and most
+# users of the package don't need it
+np: Any = None
+
+
+def _import_numpy() -> None:
+    global np
+
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("numpy is required for ListeningStats") from None
+
+        np = numpy
+
+
+class Streak:
+    __slots__ = ("days", "start", "end")
+
+    def __init__(self, days: int, start: Optional[int], end: Optional[int]) -> None:
+        self.days = days
+        # UNIX time of the first and last day of the streak
+        self.start = start
+        self.end = end
+
+    def __repr__(self) -> str:
+        return f"<Streak days={self.days} start={self.start} end={self.end}>"
+
+
+class _Interner:
+    """Maps strings to dense integer ids"""
+
+    __slots__ = ("ids", "names")
+
+    def __init__(self) -> None:
+        self.ids: Dict[Any, int] = {}
+        self.names: List[Any] = []
+
+    def __call__(self, name: Any) -> int:
+        index = self.ids.get(name)
+
+        if index is None:
+            index = self.ids[name] = len(self.names)
+            self.names.append(name)
+
+        return index
+
+
+class ListeningStats:
+    """Listening statistics computed over columns of scrobbles
+
+    Scrobbles are stored as an int64 column of UNIX times plus interned
+    artist, album and track id columns, and every aggregate is a vectorized
+    group-by over them. Tracks are keyed on (artist, track) so two songs
+    with the same title don't get merged. Needs numpy.
+
+    ```
+    stats = ListeningStats()
+    async for page in ...:
+        stats.add_page(page)
+    stats.top("artist", 10)
+    ```"""
+
+    def __init__(self) -> None:
+        _import_numpy()
+
+        self._epochs = array("q")
+        self._ids = {column: array("l") for column in COLUMNS}
+        self._interners = {column: _Interner() for column in COLUMNS}
+
+        self._cache: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self._epochs)
+
+    def _append(self, played_at: int, artist: str, album: str, track: str) -> None:
+        self._epochs.append(played_at)
+        self._ids["artist"].append(self._interners["artist"](artist))
+        self._ids["album"].append(self._interners["album"]((artist, album)))
+        self._ids["track"].append(self._interners["track"]((artist, track)))
+
+    def add_page(self, data: Dict[Any, Any]) -> int:
+        """Adds the scrobbles of a decoded user.getRecentTracks response
+
+        Reads the response directly, without building models. Returns how
+        many scrobbles were added, the now playing row is skipped."""
+
+        added = 0
+
+        for row in data["recenttracks"]["track"]:
+            date = row.get("date")
+
+            if not date:
+                continue
+
+            artist = row["artist"]
+            self._append(
+                int(date["uts"]),
+                artist.get("name") or artist.get("#text", ""),
+                row["album"].get("#text", ""),
+                row["name"],
+            )
+            added += 1
+
+        self._cache = None
+        return added
+
+    def add_tracks(self, tracks: Iterable["UserRecentTrack"]) -> int:
+        """Adds parsed recent tracks, now playing ones are skipped"""
+
+        added = 0
+
+        for track in tracks:
+            if track.played_at is None:
+                continue
+
+            self._append(
+                to_timestamp(track.played_at),
+                track.artist.name or "",
+                track.album.name,
+                track.name,
+            )
+            added += 1
+
+        self._cache = None
+        return added
+
+    async def add_history(self, tracks: AsyncIterable["UserRecentTrack"]) -> int:
+        """Adds every track of e.g. AsyncClient.iter_user_recent_tracks"""
+
+        added = 0
+
+        async for track in tracks:
+            added += self.add_tracks((track,))
+
+        return added
+
+    def _columns(self) -> Dict[str, Any]:
+        # copied rather than viewed, a view would keep the arrays from
+        # growing when more scrobbles are added
+        if self._cache is None:
+            self._cache = {"epoch": np.array(self._epochs, dtype=np.int64)}
+
+            for column in COLUMNS:
+                self._cache[column] = np.array(self._ids[column], dtype=np.int64)
+
+        return self._cache
+
+    def _select(
+        self, column: str, since: Optional[int], until: Optional[int]
+    ) -> Tuple[Any, Any]:
+        if column not in COLUMNS:
+            raise InvalidArguments(f"column must be one of {', '.join(COLUMNS)}")
+
+        columns = self._columns()
+        epochs, ids = columns["epoch"], columns[column]
+
+        if since is not None or until is not None:
+            mask = np.ones(len(epochs), dtype=bool)
+
+            if since is not None:
+                mask &= epochs >= since
+
+            if until is not None:
+                mask &= epochs < until
+
+            epochs, ids = epochs[mask], ids[mask]
+
+        return epochs, ids
+
+    def top(
+        self,
+        column: str,
+        limit: int = 10,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> List[Tuple[Any, int]]:
+        """Most played artists, albums or tracks as (name, plays) pairs
+
+        Albums and tracks are named (artist, name)."""
+
+        _, ids = self._select(column, since, until)
+        counts = np.bincount(ids, minlength=len(self._interners[column].names))
+
+        order = np.argsort(-counts, kind="stable")[:limit]
+        interner = self._interners[column]
+
+        return [(interner.names[i], int(counts[i])) for i in order if counts[i]]
+
+    def weekly_top(
+        self, column: str, limit: int = 10, utc_offset: int = 0
+    ) -> Dict[int, List[Tuple[Any, int]]]:
+        """Top artists, albums or tracks of every week, keyed on the UNIX time
+        the week (starting on monday) begins"""
+
+        epochs, ids = self._select(column, None, None)
+
+        if not len(epochs):
+            return {}
+
+        weeks = (epochs + utc_offset + WEEK_OFFSET) // WEEK
+        size = len(self._interners[column].names)
+
+        keys, counts = np.unique(weeks * size + ids, return_counts=True)
+        key_weeks, key_ids = keys // size, keys % size
+
+        # sorted by week, then by plays descending
+        order = np.lexsort((-counts, key_weeks))
+        key_weeks, key_ids, counts = key_weeks[order], key_ids[order], counts[order]
+
+        starts = np.flatnonzero(np.r_[True, key_weeks[1:] != key_weeks[:-1]])
+        ends = np.r_[starts[1:], len(key_weeks)]
+
+        interner = self._interners[column]
+        result: Dict[int, List[Tuple[Any, int]]] = {}
+
+        for start, end in zip(starts, ends):
+            week_start = int(key_weeks[start]) * WEEK - WEEK_OFFSET - utc_offset
+            result[week_start] = [
+                (interner.names[key_ids[i]], int(counts[i]))
+                for i in range(start, min(end, start + limit))
+            ]
+
+        return result
+
+    def hour_histogram(self, utc_offset: int = 0) -> List[int]:
+        """Scrobbles per hour of the day, `utc_offset` in seconds"""
+
+        epochs = self._columns()["epoch"]
+        hours = ((epochs + utc_offset) // 3600) % 24
+
+        return np.bincount(hours, minlength=24).tolist()
+
+    def weekday_histogram(self, utc_offset: int = 0) -> List[int]:
+        """Scrobbles per day of the week, starting on monday"""
+
+        epochs = self._columns()["epoch"]
+        days = ((epochs + utc_offset + WEEK_OFFSET) // DAY) % 7
+
+        return np.bincount(days, minlength=7).tolist()
+
+    def streaks(self, utc_offset: int = 0) -> List[Streak]:
+        """Every run of consecutive days with at least one scrobble, longest first"""
+
+        epochs = self._columns()["epoch"]
+
+        if not len(epochs):
+            return []
+
+        days = np.unique((epochs + utc_offset) // DAY)
+        breaks = np.flatnonzero(np.diff(days) != 1)
+
+        starts = np.r_[0, breaks + 1]
+        ends = np.r_[breaks, len(days) - 1]
+        lengths = ends - starts + 1
+
+        order = np.argsort(-lengths, kind="stable")
+
+        return [
+            Streak(
+                int(lengths[i]),
+                int(days[starts[i]]) * DAY - utc_offset,
+                int(days[ends[i]]) * DAY - utc_offset,
+            )
+            for i in order
+        ]
+
+    def longest_streak(self, utc_offset: int = 0) -> Streak:
+        streaks = self.streaks(utc_offset)
+        return streaks[0] if streaks else Streak(0, None, None)
@@ -0,0 +1,289 @@
+import asyncio
+import threading
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+from .album import Album, ArtistTopAlbum
+from .artist import Artist, SearchArtist, SimilarArtist
+from .batch import BatchResult
+from .client import AsyncClient
+from .errors import InvalidArguments
+from .page import Page
+from .track import ArtistTopTrack, UserRecentTrack
+from .user import User
+
+__all__ = ["Client"]
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Client:
+    """Synchronous last.fm client
+
+    Runs an AsyncClient on a background event loop, so every call reuses the
+    same loop and connection pool. Keyword arguments are passed to
+    AsyncClient. A Client can be shared between threads, calls made at the
+    same time run concurrently on the loop."""
+
+    def __init__(self, api_key: str, **options: Any) -> None:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="lastfm-client", daemon=True
+        )
+        self._thread.start()
+
+        self.client = AsyncClient(api_key, **options)
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _run(self, coro: Coroutine[Any, Any, T]) -> T:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def _iterate(self, iterator: AsyncIterator[T]) -> Iterator[T]:
+        async def next_item() -> T:
+            return await iterator.__anext__()
+
+        try:
+            while True:
+                try:
+                    yield self._run(next_item())
+                except StopAsyncIteration:
+                    return
+        finally:
+            aclose = getattr(iterator, "aclose", None)
+
+            if aclose is not None and not self._loop.is_closed():
+                self._run(aclose())
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+
+        self._run(self.client.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def map(
+        self,
+        func: Callable[[T], Awaitable[R]],
+        items: Iterable[T],
+        concurrency: int = 10,
+        return_exceptions: bool = False,
+    ) -> List[Union[R, Exception]]:
+        """Calls `func` on every item concurrently, returns the results in order
+
+        `func` is a method of this client returning one result, like in
+        `client.map(client.fetch_artist, names)`, or a coroutine function
+        taking one item. At most `concurrency` calls run at once. With
+        `return_exceptions`, errors are returned in place of their result
+        instead of being raised."""
+
+        if concurrency < 1:
+            raise InvalidArguments("concurrency must be at least 1.")
+
+        # methods of this client map onto the AsyncClient method of the same name
+        if getattr(func, "__self__", None) is self:
+            func = getattr(self.client, func.__name__)
+
+        if not asyncio.iscoroutinefunction(func):
+            raise InvalidArguments(
+                "func must be a coroutine function or a method of this client "
+                "returning a single result."
+            )
+
+        items = list(items)
+
+        async def run() -> List[Any]:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def call(item: T) -> Any:
+                async with semaphore:
+                    return await func(item)
+
+            return await asyncio.gather(
+                *(call(item) for item in items), return_exceptions=return_exceptions
+            )
+
+        return self._run(run())
+
+    def fetch_raw(self, endpoint: str, params: Optional[dict] = None) -> bytes:
+        return self._run(self.client.fetch_raw(endpoint, params))
+
+    def fetch_user(self, username: str) -> User:
+        return self._run(self.client.fetch_user(username))
+
+    def fetch_artist(
+        self,
+        artist: Optional[str] = None,
+        mbid: Optional[str] = None,
+        username: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Artist:
+        return self._run(self.client.fetch_artist(artist, mbid, username, fields))
+
+    def fetch_artists(
+        self,
+        artists: Iterable[str],
+        username: Optional[str] = None,
+        mbid: bool = False,
+        concurrency: int = 10,
+        ordered: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Iterator[BatchResult[str, Artist]]:
+        return self._iterate(
+            self.client.fetch_artists(
+                artists, username, mbid, concurrency, ordered, fields
+            )
+        )
+
+    def fetch_similar_artists(
+        self,
+        artist: Optional[str] = None,
+        mbid: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[SimilarArtist]:
+        return self._run(self.client.fetch_similar_artists(artist, mbid, limit))
+
+    def search_artists(
+        self,
+        artist: Optional[str] = None,
+        limit: Optional[int] = None,
+        page: Optional[int] = None,
+    ) -> Page[SearchArtist]:
+        return self._run(self.client.search_artists(artist, limit, page))
+
+    def iter_search_artists(
+        self,
+        artist: str,
+        limit: int = 30,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> Iterator[SearchArtist]:
+        return self._iterate(
+            self.client.iter_search_artists(artist, limit, prefetch, max_items)
+        )
+
+    def fetch_artist_top_tracks(
+        self,
+        artist: Optional[str] = None,
+        mbid: Optional[str] = None,
+        limit: Optional[int] = None,
+        page: Optional[int] = None,
+    ) -> Page[ArtistTopTrack]:
+        return self._run(self.client.fetch_artist_top_tracks(artist, mbid, limit, page))
+
+    def iter_artist_top_tracks(
+        self,
+        artist: Optional[str] = None,
+        mbid: Optional[str] = None,
+        limit: int = 50,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> Iterator[ArtistTopTrack]:
+        return self._iterate(
+            self.client.iter_artist_top_tracks(artist, mbid, limit, prefetch, max_items)
+        )
+
+    def fetch_artist_top_albums(
+        self,
+        artist: Optional[str] = None,
+        mbid: Optional[str] = None,
+        limit: Optional[int] = None,
+        page: Optional[int] = None,
+    ) -> Page[ArtistTopAlbum]:
+        return self._run(self.client.fetch_artist_top_albums(artist, mbid, limit, page))
+
+    def iter_artist_top_albums(
+        self,
+        artist: Optional[str] = None,
+        mbid: Optional[str] = None,
+        limit: int = 50,
+        prefetch: int = 2,
+        max_items: Optional[int] = None,
+    ) -> Iterator[ArtistTopAlbum]:
+        return self._iterate(
+            self.client.iter_artist_top_albums(artist, mbid, limit, prefetch, max_items)
+        )
+
+    def fetch_album(
+        self,
+        artist: Optional[str] = None,
+        album: Optional[str] = None,
+        mbid: Optional[str] = None,
+        username: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Album:
+        return self._run(self.client.fetch_album(artist, album, mbid, username, fields))
+
+    def fetch_albums(
+        self,
+        albums: Iterable[Tuple[str, str]],
+        username: Optional[str] = None,
+        concurrency: int = 10,
+        ordered: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Iterator[BatchResult[Tuple[str, str], Album]]:
+        return self._iterate(
+            self.client.fetch_albums(albums, username, concurrency, ordered, fields)
+        )
+
+    def fetch_albums_by_mbid(
+        self,
+        mbids: Iterable[str],
+        username: Optional[str] = None,
+        concurrency: int = 10,
+        ordered: bool = False,
+        fields: Optional[Iterable[str]] = None,
+    ) -> Iterator[BatchResult[str, Album]]:
+        return self._iterate(
+            self.client.fetch_albums_by_mbid(
+                mbids, username, concurrency, ordered, fields
+            )
+        )
+
+    def fetch_user_recent_tracks(
+        self,
+        user: str,
+        limit: Optional[int] = None,
+        page: Optional[int] = None,
+        extended: Optional[bool] = None,
+        to: Optional[int] = None,
+        from_: Optional[int] = None,
+    ) -> Page[UserRecentTrack]:
+        return self._run(
+            self.client.fetch_user_recent_tracks(user, limit, page, extended, to, from_)
+        )
+
+    def iter_user_recent_tracks(
+        self,
+        user: str,
+        extended: Optional[bool] = None,
+        to: Optional[int] = None,
+        from_: Optional[int] = None,
+        limit: int = 200,
+        prefetch: int = 2,
+        now_playing: bool = False,
+    ) -> Iterator[UserRecentTrack]:
+        return self._iterate(
+            self.client.iter_user_recent_tracks(
+                user, extended, to, from_, limit, prefetch, now_playing
+            )
+        )
@@ -1,6 +1,11 @@
 from dataclasses import dataclass
 
+from .utils import slotted
 
+__all__ = ["AlbumTag"]
+
+
+@slotted
 @dataclass(frozen=True)
 class AlbumTag:
     url: str
@@ -3,6 +3,8 @@ from dataclasses import dataclass
 import datetime
 from typing import List, TYPE_CHECKING, Optional
 
+from .utils import slotted
+
 if TYPE_CHECKING:
     from .artist import MiniArtist
     from .image import Image
@@ -10,7 +12,10 @@ if TYPE_CHECKING:
     from .album import UserRecentTrackAlbum
     from .attr import UserRecentTrackAttr
 
+__all__ = ["ArtistTopTrack", "UserRecentTrack"]
+
 
+@slotted
 @dataclass(frozen=True)
 class ArtistTopTrack:
     name: str
@@ -22,6 +27,7 @@ class ArtistTopTrack:
     images: Image
 
 
+@slotted
 @dataclass(frozen=True)
 class UserRecentTrack:
     artist: UserRecentTrackArtist
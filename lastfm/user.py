@@ -6,65 +6,42 @@ __all__ = ["User"]
 
 
 class User:
-    def __init__(self, data: Dict[Any, Any]) -> None:
-        self._data = data["user"]
-
-    @property
-    def url(self) -> str:
-        return self._data["url"]
-
-    @property
-    def type(self) -> str:
-        return self._data["type"]
-
-    @property
-    def name(self) -> str:
-        return self._data["name"]
-
-    @property
-    def realname(self) -> Optional[str]:
-        return self._data["name"] if self._data["name"] != "" else None
-
-    @property
-    def country(self) -> Optional[str]:
-        return self._data["country"] if self._data["country"] != "" else None
-
-    @property
-    def gender(self) -> str:
-        return self._data["gender"]
-
-    @property
-    def age(self) -> int:
-        return int(self._data["age"])
+    __slots__ = (
+        "url",
+        "type",
+        "name",
+        "realname",
+        "country",
+        "gender",
+        "age",
+        "playcount",
+        "artist_count",
+        "playlists",
+        "track_count",
+        "album_count",
+        "subscriber",
+        "registered",
+        "images",
+    )
 
-    @property
-    def playcount(self) -> int:
-        return int(self._data["playcount"])
-
-    @property
-    def artist_count(self) -> int:
-        return int(self._data["artist_count"])
-
-    @property
-    def playlists(self) -> int:
-        return int(self._data["playlists"])
-
-    @property
-    def track_count(self) -> int:
-        return int(self._data["track_count"])
-
-    @property
-    def album_count(self) -> int:
-        return int(self._data["album_count"])
-
-    @property
-    def subscriber(self) -> bool:
-        return bool(int(self._data["subscriber"]))
-
-    @property
-    def registered(self) -> int:
-        return self._data["registered"]["#text"]
-
-    @property
-    def images(self) -> Image:
-        return Image(data=self._data["image"])
+    def __init__(self, data: Dict[Any, Any]) -> None:
+        data = data["user"]
+
+        self.url: str = data["url"]
+        self.type: str = data["type"]
+        self.name: str = data["name"]
+        self.realname: Optional[str] = data.get("realname") or None
+        self.country: Optional[str] = data.get("country") or None
+        self.gender: str = data.get("gender", "n")
+        self.age: int = int(data.get("age", 0))
+        self.playcount: int = int(data["playcount"])
+        self.artist_count: int = int(data.get("artist_count", 0))
+        self.playlists: int = int(data.get("playlists", 0))
+        self.track_count: int = int(data.get("track_count", 0))
+        self.album_count: int = int(data.get("album_count", 0))
+        self.subscriber: bool = bool(int(data.get("subscriber", 0)))
+        self.registered: int = int(data["registered"]["#text"])
+        self.images: Image = Image(data=data["image"])
+
+    def __repr__(self) -> str:
+        return f"<User name={self.name!r} playcount={self.playcount}>"
@@ -0,0 +1,173 @@
+import datetime
+from collections import OrderedDict
+from dataclasses import fields
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+)
+
+from dateutil.parser import parse
+
+__all__ = []
+
+T = TypeVar("T")
+
+# format of the "#text" dates last.fm sends, e.g. "13 Sep 2020, 12:26"
+DATE_FORMAT = "%d %b %Y, %H:%M"
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def slotted(cls: Type[T]) -> Type[T]:
+    """Rebuilds a frozen dataclass with __slots__
+
+    Same as dataclass(slots=True), which needs python 3.10. Goes above the
+    @dataclass decorator."""
+
+    names: Tuple[str, ...] = tuple(f.name for f in fields(cls))  # type: ignore
+
+    namespace = dict(cls.__dict__)
+    namespace["__slots__"] = names
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+
+    for name in names:
+        namespace.pop(name, None)
+
+    # frozen instances can't be restored with setattr, which pickle uses by default
+    def __getstate__(self: Any) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in names)
+
+    def __setstate__(self: Any, state: Tuple[Any, ...]) -> None:
+        for name, value in zip(names, state):
+            object.__setattr__(self, name, value)
+
+    namespace["__getstate__"] = __getstate__
+    namespace["__setstate__"] = __setstate__
+
+    new_cls = type(cls)(cls.__name__, cls.__bases__, namespace)
+    new_cls.__qualname__ = cls.__qualname__
+
+    return new_cls
+
+
+def parse_played_at(data: Dict[Any, Any]) -> datetime.datetime:
+    """Naive UTC datetime of a recent track's `date` object
+
+    Built from the `uts` epoch when present, which is much cheaper than
+    parsing the text."""
+
+    uts = data.get("uts")
+
+    if uts:
+        return _EPOCH + datetime.timedelta(seconds=int(uts))
+
+    return datetime.datetime.strptime(data["#text"], DATE_FORMAT)
+
+
+@lru_cache(maxsize=4096)
+def parse_published(text: str) -> Optional[datetime.datetime]:
+    """Parses a wiki's `published` date, None if it can't be parsed"""
+
+    try:
+        return datetime.datetime.strptime(text, DATE_FORMAT)
+    except ValueError:
+        pass
+
+    try:
+        return parse(text)
+    except (ValueError, OverflowError):
+        return None
+
+
+def to_timestamp(dt: datetime.datetime) -> int:
+    """UNIX time of a naive UTC datetime"""
+
+    return int((dt - _EPOCH).total_seconds())
+
+
+class EntityCache:
+    """Bounded identity map for immutable parsed objects
+
+    Objects built from equal raw values are shared instead of being built
+    again, so e.g. the same artist showing up on thousands of scrobbles is a
+    single instance. Holds at most `max_size` objects, least recently used
+    ones are dropped first."""
+
+    __slots__ = ("max_size", "_entries")
+
+    def __init__(self, max_size: int = 65536) -> None:
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """Returns the object stored for `key`, building it with `factory` if needed"""
+
+        entries = self._entries
+
+        try:
+            value = entries[key]
+        except KeyError:
+            if self.max_size <= 0:
+                return factory()
+
+            value = entries[key] = factory()
+
+            if len(entries) > self.max_size:
+                entries.popitem(last=False)
+        else:
+            entries.move_to_end(key)
+
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# (played_at, artist, track) identifying a scrobble, played_at in UNIX time
+ScrobbleKey = Tuple[int, Optional[str], str]
+
+
+def scrobble_key(data: Dict[Any, Any]) -> ScrobbleKey:
+    """ScrobbleKey of a raw user.getRecentTracks track, extended or not"""
+
+    artist = data["artist"]
+    return (
+        int(data["date"]["uts"]),
+        artist.get("name") or artist.get("#text"),
+        data["name"],
+    )
+
+
+class PageBoundary:
+    """Drops scrobbles repeated across a page boundary
+
+    If the history shifts between two page requests, rows at the bottom of a
+    page show up again at the top of the next one. `keep(key)` tells whether
+    a scrobble wasn't on the previous page, `next_page()` is called once a
+    page is done."""
+
+    __slots__ = ("previous", "current")
+
+    def __init__(self, previous: Iterable[ScrobbleKey] = ()) -> None:
+        self.previous: Set[ScrobbleKey] = set(previous)
+        self.current: Set[ScrobbleKey] = set()
+
+    def keep(self, key: ScrobbleKey) -> bool:
+        self.current.add(key)
+        return key not in self.previous
+
+    def next_page(self) -> None:
+        self.previous, self.current = self.current, set()
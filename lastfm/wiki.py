@@ -2,7 +2,12 @@ import datetime
 from dataclasses import dataclass
 from typing import Optional
 
+from .utils import slotted
 
+__all__ = ["AlbumWiki"]
+
+
+@slotted
 @dataclass(frozen=True)
 class AlbumWiki:
     published: Optional[datetime.datetime]
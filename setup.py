@@ -11,4 +11,5 @@ setup(
     packages=["lastfm"],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={"stats": ["numpy"]},
 )
@@ -0,0 +1,36 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from lastfm import ListeningStats
+
+
+def page(*rows):
+    return {
+        "recenttracks": {
+            "track": [
+                {
+                    "artist": {"#text": artist},
+                    "album": {"#text": "Album"},
+                    "name": name,
+                    "date": {"uts": str(played_at)},
+                }
+                for played_at, artist, name in rows
+            ]
+        }
+    }
+
+
+def test_adding_after_querying():
+    stats = ListeningStats()
+
+    stats.add_page(page((100, "A", "one"), (200, "B", "two")))
+    assert stats.top("artist") == [("A", 1), ("B", 1)]
+
+    stats.add_page(page((300, "A", "three")))
+    assert stats.top("artist") == [("A", 2), ("B", 1)]
+    assert stats.top("track", 1) == [(("A", "one"), 1)]
+
+    stats.add_page(page((400, "B", "two"), (500, "B", "two")))
+    assert stats.top("artist", 1) == [("B", 3)]
+    assert len(stats) == 5